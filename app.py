@@ -9,13 +9,19 @@ from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
 # local imports
-from backend.utils import get_logger
+from backend.utils import get_logger, RequestContextMiddleware
 from backend.api.ai import router as ai_router
 from backend.api.board import router as board_router
 from backend.api.analytics import router as analytics_router
 from backend.api.config import router as config_router
+from backend.api.metrics import router as metrics_router
+from backend.api.admin import router as admin_router
 
-from backend.database.db_driver import init_db
+from backend.database.db_driver import init_db, close_db
+from backend.services.pool import puzzle_pool
+from backend.services.ai import open_llm_clients, close_llm_clients
+from backend.services.metrics import MetricsMiddleware
+from backend.services.profiling import profiler
 
 BASE_DIR = Path(__file__).resolve().parent
 logger = get_logger(__name__)
@@ -28,15 +34,31 @@ async def lifespan(app: FastAPI):
     init_db()
     logger.info("Sudoku database initialized")
 
+    # start refilling the puzzle pool in the background
+    await puzzle_pool.start()
+
+    # one keep-alive HTTP pool for all LLM calls
+    await open_llm_clients()
+
     try:
         yield  # app runs while this is active
         
     finally:
         # shutdown
+        await close_llm_clients()
+        await puzzle_pool.stop()
+        close_db()
+        profiler.flush()
         logger.info("Shutting down FastAPI app")
 
 app = FastAPI(lifespan=lifespan)
 
+# request counts and latency per route, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# request IDs for log lines (outermost, so every log call in a request sees one)
+app.add_middleware(RequestContextMiddleware)
+
 # static files
 app.mount(
     "/static",
@@ -59,4 +81,6 @@ async def analytics(request: Request):
 app.include_router(ai_router)
 app.include_router(board_router)
 app.include_router(analytics_router)
-app.include_router(config_router)
\ No newline at end of file
+app.include_router(config_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
\ No newline at end of file
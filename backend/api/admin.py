@@ -0,0 +1,57 @@
+# backend/api/admin.py
+
+# imports
+import os
+import secrets
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+
+# local imports
+from backend.services.profiling import profiler
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+# admin routes are off unless ADMIN_TOKEN is set; callers send it as X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)], include_in_schema=False)
+
+class ProfilingUpdate(BaseModel):
+    sample_rate: Optional[float] = None     # 0 switches profiling off
+    mode: Optional[str] = None              # "stack" or "cprofile"
+    interval_ms: Optional[float] = None
+    reset: bool = False                     # drop what has been collected so far
+
+@router.get("/profiling")
+def profiling_status() -> Dict[str, Any]:
+    return profiler.status()
+
+@router.post("/profiling")
+def update_profiling(update: ProfilingUpdate) -> Dict[str, Any]:
+    try:
+        profiler.configure(
+            sample_rate=update.sample_rate,
+            mode=update.mode,
+            interval_ms=update.interval_ms,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if update.reset:
+        profiler.reset()
+    return profiler.status()
+
+# write the collapsed stacks / .prof files now rather than on the next periodic flush
+@router.post("/profiling/flush")
+def flush_profiling() -> Dict[str, Any]:
+    written = profiler.flush()
+    logger.info("Flushed %d profile file(s)", len(written))
+    return {"files": [str(p) for p in written]}
@@ -1,17 +1,28 @@
 # backend/api/ai.py
 
 # imports
+import json
+from dataclasses import dataclass
 from fastapi import APIRouter, Request, HTTPException, status
-from typing import List, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, AsyncIterator
 from pydantic import BaseModel
 
 # local imports
-from backend.database.db_driver import log_step
-from backend.services.ai import call_llm, validate_query_params, add_board_to_messages, ChatMessage
+from backend.database.db_driver import alog_step
+from backend.services.ai import (
+    call_llm, stream_llm, validate_query_params, add_board_to_messages, add_hint_to_messages,
+    ChatMessage, FAST_HINTS,
+)
 from backend.services.board import solve_board
-from backend.services.hints import extract_hint_fields
+from backend.services.llm_cache import llm_cache
+from backend.services.metrics import stage
+from backend.services.profiling import profiler
+from backend.services.hints import (
+    LogicalHint, aextract_hint_fields, find_logical_hint, describe_hint,
+)
 from backend.utils import load_prompt
-from backend.utils import get_logger
+from backend.utils import get_logger, session_id_var
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/ai")
@@ -22,6 +33,7 @@ class ChatRequest(BaseModel):
     board: str
     puzzle_id: str
     session_id: str
+    fast_hint: Optional[bool] = None  # skip the LLM for single-cell hints (defaults to FAST_HINTS)
 
 # helper to check if last message requests a single hint
 def last_message_has_single_hint(messages: List[ChatMessage]) -> bool:
@@ -33,67 +45,189 @@ def last_message_has_single_hint(messages: List[ChatMessage]) -> bool:
     last = messages[-1]
     return last.role == "user" and TARGET in last.content
 
-@router.post("/query")
-async def query_endpoint(req: ChatRequest) -> Dict[str, Any]:
+# everything a query needs once inputs are validated and the board is solved
+@dataclass
+class QueryContext:
+    board: str
+    solved_board: str
+    puzzle_id: str
+    session_id: str
+    messages: List[ChatMessage]
+    hint_btn_pressed: bool
+    local_hint: Optional[LogicalHint]
+    fast_hint: bool
+
+# validate, solve and build the LLM messages for a chat request
+def prepare_query(req: ChatRequest) -> QueryContext:
     data = req.model_dump()
     board = data.get("board")
     puzzle_id = data.get("puzzle_id")
     session_id = data.get("session_id")
-    logger.info(f"Received /ai/query for puzzle_id={puzzle_id}, session_id={session_id}")
+    session_id_var.set(session_id)  # tags the rest of this request's log lines
+    logger.info("Received /ai/query for puzzle_id=%s, session_id=%s", puzzle_id, session_id)
     messages = req.messages
     
     # validate inputs
     try:
-        messages = validate_query_params(
-            board=board,
-            session_id=session_id,
-            messages=messages
-        )
+        with stage("validate"):
+            messages = validate_query_params(
+                board=board,
+                session_id=session_id,
+                messages=messages
+            )
     except HTTPException as e:
         raise e
     
-    solved_board = solve_board(board)
-    messages = add_board_to_messages(messages, board, solved_board)
-    hint_btn_pressed = last_message_has_single_hint(messages)
-    
-    logger.info(f"Original board: {board}")
-    logger.info(f"Solved board: {solved_board}")
-    logger.debug(f"Messages for LLM: {messages}")
-
-    # call llm
+    # well-formed boards can still clash, have no solution or have several
     try:
-        response = await call_llm([msg.model_dump() for msg in messages])
-        
-    except Exception as e:
-        logger.exception("Unexpected error in /ai/query")
+        with stage("solve_board"):
+            solved_board = solve_board(board)
+    except ValueError as e:
+        logger.warning("Unsolvable board provided: %s (%s)", board, e)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Unexpected server error."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid board string. {e}"
         )
+
+    with stage("build_prompt"):
+        messages = add_board_to_messages(messages, board, solved_board)
+    hint_btn_pressed = last_message_has_single_hint(messages)
     
-    if not hint_btn_pressed:
-        logger.info("Successfully responded without hint extraction.")
-        return {"reply": response}
-    
-    hint = extract_hint_fields(response)
+    logger.debug("Original board: %s", board)
+    logger.debug("Solved board: %s", solved_board)
+
+    # answer single-cell hints from the local step solver when it can (9×9 only)
+    with stage("local_hint"):
+        local_hint = find_logical_hint(board, solved_board) if hint_btn_pressed and len(board) == 81 else None
+    fast_hint = FAST_HINTS if req.fast_hint is None else req.fast_hint
+
+    if local_hint is not None:
+        logger.info(
+            "Local hint engine found %s at R%dC%d", local_hint.method_used, local_hint.r, local_hint.c
+        )
+        messages = add_hint_to_messages(messages, local_hint)
     
-    # log the step
-    log_step(
-        puzzle=puzzle_id,
+    logger.debug("Messages for LLM: %s", messages)
+
+    return QueryContext(
+        board=board,
+        solved_board=solved_board,
+        puzzle_id=puzzle_id,
         session_id=session_id,
-        hint_text=response,
-        r=hint.r,
-        c=hint.c,
-        value=hint.value,
-        method_used=hint.method_used
+        messages=messages,
+        hint_btn_pressed=hint_btn_pressed,
+        local_hint=local_hint,
+        fast_hint=fast_hint,
     )
+
+# work out the hinted move for a finished reply and log it as a solve step
+async def record_hint(ctx: QueryContext, response: str) -> Dict[str, Any]:
+    # the local engine already knows the move; only parse LLM text as a fallback
+    if ctx.local_hint is not None:
+        hint = ctx.local_hint
+    else:
+        with stage("extract_hint"):
+            hint = await aextract_hint_fields(response, board=ctx.board, solution=ctx.solved_board)
+    
+    # log the step
+    with stage("log_step"):
+        await alog_step(
+            puzzle=ctx.puzzle_id,
+            session_id=ctx.session_id,
+            hint_text=response,
+            r=hint.r,
+            c=hint.c,
+            value=hint.value,
+            method_used=hint.method_used
+        )
     
     logger.info("Successfully extracted hint fields and logged step.")
     
     return {
-        "reply": response,
         "r": hint.r,
         "c": hint.c,
         "value": hint.value,
-        "method_used": hint.method_used
-    }
\ No newline at end of file
+        "method_used": hint.method_used,
+        "eliminations": ctx.local_hint.eliminations if ctx.local_hint is not None else [],
+        "hardest_technique": ctx.local_hint.hardest_technique if ctx.local_hint is not None else None,
+    }
+
+@router.post("/query")
+async def query_endpoint(req: ChatRequest) -> Dict[str, Any]:
+    with profiler.profile("ai_query"):
+        return await _answer_query(req)
+
+async def _answer_query(req: ChatRequest) -> Dict[str, Any]:
+    ctx = prepare_query(req)
+
+    if ctx.local_hint is not None and ctx.fast_hint:
+        response = describe_hint(ctx.local_hint)
+    else:
+        # call llm
+        try:
+            with stage("llm"):
+                response = await call_llm(
+                    [msg.model_dump() for msg in ctx.messages],
+                    board=ctx.board,
+                )
+            
+        except Exception as e:
+            logger.exception("Unexpected error in /ai/query")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Unexpected server error."
+            )
+    
+    if not ctx.hint_btn_pressed:
+        logger.info("Successfully responded without hint extraction.")
+        return {"reply": response}
+    
+    hint_fields = await record_hint(ctx, response)
+    return {"reply": response, **hint_fields}
+
+@router.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    return llm_cache.stats()
+
+# format one Server-Sent Event
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/query/stream")
+async def query_stream_endpoint(req: ChatRequest) -> StreamingResponse:
+    # validation errors still surface as normal HTTP errors before streaming starts
+    ctx = prepare_query(req)
+
+    async def events() -> AsyncIterator[str]:
+        parts: List[str] = []
+
+        if ctx.local_hint is not None and ctx.fast_hint:
+            parts.append(describe_hint(ctx.local_hint))
+            yield _sse("token", {"text": parts[-1]})
+        else:
+            try:
+                messages = [msg.model_dump() for msg in ctx.messages]
+                # includes the time the client takes to read each token
+                with stage("llm"):
+                    async for text in stream_llm(messages, board=ctx.board):
+                        parts.append(text)
+                        yield _sse("token", {"text": text})
+            except Exception:
+                logger.exception("Unexpected error in /ai/query/stream")
+                yield _sse("error", {"detail": "Unexpected server error."})
+                return
+
+        response = "".join(parts)
+        if not response.strip():
+            response = "(no reply from model)"
+
+        if ctx.hint_btn_pressed:
+            yield _sse("hint", await record_hint(ctx, response))
+
+        yield _sse("done", {"reply": response})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,21 +1,55 @@
 # backend/api/analytics.py
 
 # imports
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+import json
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Iterator, Literal, Optional
 
 # local imports
 from backend.utils import get_logger
-from backend.services.analytics import get_solve_steps
+from backend.services.analytics import (
+    StepFilters, STREAM_CHUNK, get_solve_steps, iter_solve_steps,
+    get_session_summary, get_technique_summary, get_difficulty_summary, get_volume_summary,
+)
 from backend.database.db_driver import create_puzzle
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/analytics")
 
 @router.get("/steps")
-async def steps() -> List[Dict[str, Any]]:
+async def steps(
+    session_id: Optional[str] = None,
+    puzzle: Optional[str] = None,
+    method: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="page size (default 100; ndjson: all rows)"),
+    include_hint_text: bool = True,
+    format: Literal["json", "ndjson"] = "json",
+):
+    filters = StepFilters(session_id=session_id, puzzle=puzzle, method=method, since=since, until=until)
+
+    # stream every match as one JSON object per line without buffering the result
+    if format == "ndjson":
+        def lines() -> Iterator[str]:
+            # one chunk per yield; each yield is a threadpool hop for sync iterators
+            buf: List[str] = []
+            for step in iter_solve_steps(filters, cursor, limit, include_hint_text):
+                buf.append(json.dumps(step) + "\n")
+                if len(buf) >= STREAM_CHUNK:
+                    yield "".join(buf)
+                    buf = []
+            if buf:
+                yield "".join(buf)
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
     try:
-        data = get_solve_steps()
+        data = await asyncio.to_thread(get_solve_steps, filters, cursor, limit or 100, include_hint_text)
         
     except Exception as _:
         logger.exception("Failed to fetch solve steps.")
@@ -23,6 +57,29 @@ async def steps() -> List[Dict[str, Any]]:
     
     return data
 
+# dashboard aggregates; each reads a small rollup table, never solve_steps
+@router.get("/summary/sessions")
+async def session_summary(
+    session_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(get_session_summary, session_id, limit)
+
+@router.get("/summary/techniques")
+async def technique_summary() -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(get_technique_summary)
+
+@router.get("/summary/difficulty")
+async def difficulty_summary() -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(get_difficulty_summary)
+
+@router.get("/summary/volume")
+async def volume_summary(
+    granularity: Literal["hour", "day"] = "day",
+    limit: int = Query(30, ge=1, le=10000),
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(get_volume_summary, granularity, limit)
+
 @router.post("/ingest")
 async def ingest(location_data: str):
     logger.info("Ingesting location data: %s", location_data)
@@ -1,12 +1,20 @@
 # backend/api/board.py
 
 # imports
+import time
+import asyncio
 from random import random
 from fastapi import APIRouter, HTTPException
 
 # local imports
-from backend.database.db_driver import create_puzzle
+from backend.database.db_driver import acreate_puzzle
 from backend.services.board import generate_board, validate_difficulty
+from backend.services.nxn import SHAPES
+from backend.services.canonical import canonical_hash_or_none
+from backend.services.bank import puzzle_bank
+from backend.services.pool import puzzle_pool
+from backend.services.metrics import BOARD_SECONDS, BOARDS_SERVED
+from backend.services.profiling import profiler
 from backend.utils import get_logger
 
 logger = get_logger(__name__)
@@ -17,25 +25,55 @@ MIN_VALID = 0.0     # 0% empty (easiest)
 MAX_VALID = 0.79    # theoretical max — you can choose 0.79 if you want unique solution
 
 @router.post("/new/{difficulty}")
-async def get_board(difficulty: float) -> str:
+async def get_board(difficulty: float, size: int = 9) -> str:
+    with profiler.profile("board_new"):
+        return await _new_board(difficulty, size)
+
+async def _new_board(difficulty: float, size: int) -> str:
     try:
         validate_difficulty(difficulty)
     except HTTPException as e:
         raise e
+
+    if size not in SHAPES:
+        logger.warning("Invalid board size requested: %s", size)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid size {size}. Must be one of {sorted(SHAPES)}."
+        )
+    box_rows, box_cols = SHAPES[size]
+    
+    # serve 9×9 boards from the puzzle bank or the pre-generated pool, falling back to on-demand generation
+    board = None
+    start = time.perf_counter()
+    if size == 9:
+        source = "bank"
+        board = puzzle_bank.pick(difficulty) if puzzle_bank is not None else None
+        if board is None:
+            source = "pool"
+            board = puzzle_pool.pop(difficulty)
     
     try:
-        board = generate_board(difficulty)
+        if board is None:
+            source = "generated"
+            board = await asyncio.to_thread(generate_board, difficulty, size)
     except Exception as e:
         logger.exception("Board generation failed.")
         raise HTTPException(status_code=500, detail="Failed to generate board.")
+
+    BOARD_SECONDS.labels(source).observe(time.perf_counter() - start)
+    BOARDS_SERVED.labels(source, str(size)).inc()
     
     # store the generated puzzle in the SQLite database.
     try:
-        create_puzzle(
-            size=9,
-            box_rows=3,
-            box_cols=3,
+        # hashing is CPU work; keep it off the event loop and the writer thread
+        canonical = await asyncio.to_thread(canonical_hash_or_none, size, board)
+        await acreate_puzzle(
+            size=size,
+            box_rows=box_rows,
+            box_cols=box_cols,
             initial_board_str=board,
+            canonical=canonical,
         )
     except Exception:
         logger.exception("Failed to persist generated puzzle to the database.")
@@ -0,0 +1,15 @@
+# backend/api/metrics.py
+
+# imports
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+# local imports
+from backend.services.metrics import CONTENT_TYPE, render
+
+router = APIRouter()
+
+# Prometheus scrape target
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(content=render(), media_type=CONTENT_TYPE)
@@ -1,19 +1,157 @@
 # backend/database/db_driver.py
 
 from pathlib import Path
+import asyncio
+import queue
 import sqlite3
-from typing import Optional, List
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, List, TypeVar
+
+from backend.services.metrics import DB_COMMIT_BATCH, DB_COMMIT_SECONDS, db_timer
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
 
 DB_PATH = Path(__file__).resolve().parent / "sudoku.db"
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+# connection tuning; WAL lets readers run while the writer commits
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",     # fsync at checkpoints, not every commit
+    "PRAGMA cache_size=-65536",      # 64 MiB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=OFF",
+)
+BUSY_TIMEOUT = 5.0
+
+# most writes the writer thread groups into one transaction
+WRITE_BATCH_MAX = 256
+
+def connect() -> sqlite3.Connection:
+    """New tuned connection; for long-lived cursors that need their own."""
+    # autocommit mode; the writer manages its own transactions
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT,
+        isolation_level=None,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row  # nice dict-like rows
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+_local = threading.local()
+
+def get_connection() -> sqlite3.Connection:
+    """Persistent connection for the calling thread (do not close it)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = connect()
+    return conn
+
+# single writer thread: queued writes are group-committed in one transaction
+class DBWriter:
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Optional[tuple[Callable[[sqlite3.Connection], Any], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((fn, fut))
+        return fut
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        conn = connect()
+        stop = False
+
+        while not stop:
+            item = self._queue.get()
+            batch = []
+
+            # take whatever piled up while the last commit was running
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= WRITE_BATCH_MAX:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                stop = True
+
+            if batch:
+                DB_COMMIT_BATCH.observe(len(batch))
+                with DB_COMMIT_SECONDS.time():
+                    self._commit(conn, batch)
+
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list) -> None:
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, fut in batch:
+                # a savepoint per write so one failure does not sink the batch
+                conn.execute("SAVEPOINT write")
+                try:
+                    results.append((fut, fn(conn), None))
+                    conn.execute("RELEASE write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append((fut, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.exception("Write batch failed.")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+
+        for fut, result, error in results:
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+
+    def close(self) -> None:
+        """Flush queued writes and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+writer = DBWriter()
+
+def write(fn: Callable[[sqlite3.Connection], T]) -> T:
+    """Run `fn(conn)` on the writer thread and wait for its commit."""
+    return writer.submit(fn).result()
+
+async def awrite(fn: Callable[[sqlite3.Connection], T]) -> T:
+    return await asyncio.wrap_future(writer.submit(fn))
+
+def close_db() -> None:
+    writer.close()
+
 def init_db() -> None:
     """Create tables if they don't exist."""
-    conn = get_connection()
+    conn = connect()
     cur = conn.cursor()
 
     # puzzles table: one row per puzzle
@@ -44,36 +182,263 @@ def init_db() -> None:
         )
     """)
 
-    conn.commit()
+    migrate(conn)
     conn.close()
 
-def create_puzzle(size: int, box_rows: int, box_cols: int, initial_board_str: str) -> str:
-    """Insert a new puzzle and return its ID."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO puzzles (size, box_rows, box_cols, initial_board)
-        VALUES (?, ?, ?, ?)
-        """,
-        (size, box_rows, box_cols, initial_board_str),
-    )
-    
-    conn.commit()
-    conn.close()
-    
-    return initial_board_str
+# renumber steps that an older, racy log_step gave duplicate numbers
+def _dedupe_step_numbers(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        UPDATE solve_steps
+        SET step_number = ranked.n
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY puzzle ORDER BY step_number, id) - 1 AS n
+            FROM solve_steps
+            WHERE puzzle IN (
+                SELECT puzzle FROM solve_steps
+                GROUP BY puzzle, step_number HAVING COUNT(*) > 1
+            )
+        ) AS ranked
+        WHERE solve_steps.id = ranked.id
+    """)
 
-# helper to get next step number
-def _get_next_step_number(conn: sqlite3.Connection, puzzle: str) -> int:
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT MAX(step_number) AS max_step FROM solve_steps WHERE puzzle = ?",
-        (puzzle,),
+# v1: unique (puzzle, step_number) plus lookup indexes for analytics
+def _v1_step_indexes(conn: sqlite3.Connection) -> None:
+    _dedupe_step_numbers(conn)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_solve_steps_puzzle_step ON solve_steps (puzzle, step_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_solve_steps_session ON solve_steps (session_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_solve_steps_created ON solve_steps (created_at)")
+
+# v2: method filter for /analytics/steps; (method_used, rowid) also orders by id
+def _v2_method_index(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_solve_steps_method ON solve_steps (method_used)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_solve_steps_puzzle ON solve_steps (puzzle)")
+
+# rollup tables behind /analytics/summary/*; triggers keep them current in
+# the same transaction as each insert, so dashboard reads never scan solve_steps
+ROLLUP_TABLES = ("rollup_sessions", "rollup_methods", "rollup_empties", "rollup_volume")
+
+def _create_rollups(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_sessions (
+            session_id  TEXT PRIMARY KEY,
+            hints       INTEGER NOT NULL,
+            first_at    DATETIME,
+            last_at     DATETIME
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_rollup_sessions_last ON rollup_sessions (last_at)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_methods (
+            method_used TEXT PRIMARY KEY,
+            hints       INTEGER NOT NULL
+        )
+    """)
+    # puzzle ids are the initial board, so difficulty is its share of empty
+    # cells; keyed by cell count too, since boards come in several sizes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_empties (
+            cells       INTEGER NOT NULL,
+            empties     INTEGER NOT NULL,
+            hints       INTEGER NOT NULL,
+            PRIMARY KEY (cells, empties)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_volume (
+            granularity TEXT NOT NULL,      -- 'hour' or 'day'
+            period      TEXT NOT NULL,      -- start of the bucket, UTC
+            hints       INTEGER NOT NULL,
+            PRIMARY KEY (granularity, period)
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_solve_steps_rollup AFTER INSERT ON solve_steps
+        BEGIN
+            INSERT INTO rollup_sessions (session_id, hints, first_at, last_at)
+            VALUES (NEW.session_id, 1, NEW.created_at, NEW.created_at)
+            ON CONFLICT (session_id) DO UPDATE SET
+                hints = hints + 1,
+                first_at = MIN(first_at, excluded.first_at),
+                last_at = MAX(last_at, excluded.last_at);
+
+            INSERT INTO rollup_methods (method_used, hints)
+            VALUES (COALESCE(NEW.method_used, 'Unknown'), 1)
+            ON CONFLICT (method_used) DO UPDATE SET hints = hints + 1;
+
+            INSERT INTO rollup_empties (cells, empties, hints)
+            VALUES (LENGTH(NEW.puzzle), LENGTH(NEW.puzzle) - LENGTH(REPLACE(NEW.puzzle, '0', '')), 1)
+            ON CONFLICT (cells, empties) DO UPDATE SET hints = hints + 1;
+
+            INSERT INTO rollup_volume (granularity, period, hints)
+            VALUES ('hour', SUBSTR(NEW.created_at, 1, 13) || ':00:00', 1)
+            ON CONFLICT (granularity, period) DO UPDATE SET hints = hints + 1;
+
+            INSERT INTO rollup_volume (granularity, period, hints)
+            VALUES ('day', SUBSTR(NEW.created_at, 1, 10), 1)
+            ON CONFLICT (granularity, period) DO UPDATE SET hints = hints + 1;
+        END
+    """)
+
+def rebuild_rollups(conn: sqlite3.Connection) -> None:
+    """Recompute every rollup from solve_steps (backfill / repair job)."""
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+
+    conn.execute("""
+        INSERT INTO rollup_sessions (session_id, hints, first_at, last_at)
+        SELECT session_id, COUNT(*), MIN(created_at), MAX(created_at)
+        FROM solve_steps GROUP BY session_id
+    """)
+    conn.execute("""
+        INSERT INTO rollup_methods (method_used, hints)
+        SELECT COALESCE(method_used, 'Unknown') AS m, COUNT(*)
+        FROM solve_steps GROUP BY m
+    """)
+    conn.execute("""
+        INSERT INTO rollup_empties (cells, empties, hints)
+        SELECT LENGTH(puzzle) AS n, LENGTH(puzzle) - LENGTH(REPLACE(puzzle, '0', '')) AS e, COUNT(*)
+        FROM solve_steps GROUP BY n, e
+    """)
+    conn.execute("""
+        INSERT INTO rollup_volume (granularity, period, hints)
+        SELECT 'hour', SUBSTR(created_at, 1, 13) || ':00:00' AS p, COUNT(*)
+        FROM solve_steps GROUP BY p
+    """)
+    conn.execute("""
+        INSERT INTO rollup_volume (granularity, period, hints)
+        SELECT 'day', SUBSTR(created_at, 1, 10) AS p, COUNT(*)
+        FROM solve_steps GROUP BY p
+    """)
+
+# v3: rollup tables and their trigger, backfilled from existing steps
+def _v3_rollups(conn: sqlite3.Connection) -> None:
+    _create_rollups(conn)
+    rebuild_rollups(conn)
+
+# v4: canonical hash of each puzzle so equivalent boards can be found;
+# existing rows stay NULL until `python -m sudokusage_eval backfill-hashes`
+def _v4_canonical_hash(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE puzzles ADD COLUMN canonical_hash TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_puzzles_canonical ON puzzles (canonical_hash)")
+
+# v5: solutions kept next to puzzles (bulk import fills them in)
+def _v5_solution(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE puzzles ADD COLUMN solution TEXT")
+
+# v6: rollup_empties keyed by board cell count as well, rebuilt from solve_steps
+def _v6_empties_by_size(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TRIGGER IF EXISTS tr_solve_steps_rollup")
+    conn.execute("DROP TABLE IF EXISTS rollup_empties")
+    _create_rollups(conn)
+    rebuild_rollups(conn)
+
+# schema migrations, applied in order and tracked in PRAGMA user_version
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _v1_step_indexes,
+    _v2_method_index,
+    _v3_rollups,
+    _v4_canonical_hash,
+    _v5_solution,
+    _v6_empties_by_size,
+]
+
+def migrate(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Database migrated to schema version %d", target)
+
+def _insert_puzzle(
+    size: int, box_rows: int, box_cols: int, initial_board_str: str, canonical: Optional[str]
+) -> Callable[[sqlite3.Connection], str]:
+    def run(conn: sqlite3.Connection) -> str:
+        conn.execute(
+            """
+            INSERT INTO puzzles (size, box_rows, box_cols, initial_board, canonical_hash)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (size, box_rows, box_cols, initial_board_str, canonical),
+        )
+        return initial_board_str
+    return run
+
+# the stored shape has to describe the board, or sizes other than 9 can't be read back
+def _check_shape(size: int, box_rows: int, box_cols: int, board: str) -> None:
+    if box_rows * box_cols != size or len(board) != size * size:
+        raise ValueError(
+            f"Board of {len(board)} cells does not match size {size} with {box_rows}x{box_cols} boxes."
+        )
+
+def create_puzzle(
+    size: int, box_rows: int, box_cols: int, initial_board_str: str, canonical: Optional[str] = None
+) -> str:
+    """Insert a new puzzle (with its canonical hash, if the caller has one) and return its ID."""
+    _check_shape(size, box_rows, box_cols, initial_board_str)
+    with db_timer("create_puzzle"):
+        return write(_insert_puzzle(size, box_rows, box_cols, initial_board_str, canonical))
+
+async def acreate_puzzle(
+    size: int, box_rows: int, box_cols: int, initial_board_str: str, canonical: Optional[str] = None
+) -> str:
+    _check_shape(size, box_rows, box_cols, initial_board_str)
+    with db_timer("create_puzzle"):
+        return await awrite(_insert_puzzle(size, box_rows, box_cols, initial_board_str, canonical))
+
+def find_equivalent_puzzles(canonical: str, limit: int = 10) -> List[sqlite3.Row]:
+    """Stored puzzles with this canonical hash, i.e. symmetric variants of one board."""
+    cur = get_connection().execute(
+        "SELECT * FROM puzzles WHERE canonical_hash = ? ORDER BY id LIMIT ?",
+        (canonical, limit),
     )
-    row = cur.fetchone()
-    max_step = row["max_step"] if row and row["max_step"] is not None else None
-    return 0 if max_step is None else max_step + 1
+    return cur.fetchall()
+
+def _insert_step(
+    puzzle: str,
+    session_id: str,
+    hint_text: str,
+    r: int,
+    c: int,
+    value: int,
+    method_used: str,
+    step_number: Optional[int],
+) -> Callable[[sqlite3.Connection], str]:
+    def run(conn: sqlite3.Connection) -> str:
+        if step_number is not None:
+            conn.execute(
+                """
+                INSERT INTO solve_steps
+                (puzzle, session_id, step_number, hint_text, r, c, value,
+                 method_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (puzzle, session_id, step_number, hint_text, r, c, value,
+                 method_used),
+            )
+            return puzzle
+
+        # allocate the next number in the same statement; MAX() is one seek
+        # on ux_solve_steps_puzzle_step and the index rejects duplicates
+        conn.execute(
+            """
+            INSERT INTO solve_steps
+            (puzzle, session_id, step_number, hint_text, r, c, value,
+             method_used)
+            SELECT ?, ?, COALESCE(MAX(step_number) + 1, 0), ?, ?, ?, ?, ?
+            FROM solve_steps WHERE puzzle = ?
+            """,
+            (puzzle, session_id, hint_text, r, c, value,
+             method_used, puzzle),
+        )
+        return puzzle
+    return run
 
 # log a solve step
 def log_step(
@@ -87,46 +452,39 @@ def log_step(
     step_number: Optional[int] = None,
 ) -> str:
     """Insert a solve step and return its ID."""
-    
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    if step_number is None:
-        step_number = _get_next_step_number(conn, puzzle)
-
-    cur.execute(
-        """
-        INSERT INTO solve_steps
-        (puzzle, session_id, step_number, hint_text, r, c, value,
-         method_used)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (puzzle, session_id, step_number, hint_text, r, c, value,
-         method_used),
-    )
-    
-    conn.commit()
-    conn.close()
-    
-    return puzzle
+    with db_timer("log_step"):
+        return write(_insert_step(puzzle, session_id, hint_text, r, c, value, method_used, step_number))
+
+async def alog_step(
+    puzzle: str,
+    session_id: str,
+    hint_text: str,
+    r: int,
+    c: int,
+    value: int,
+    method_used: str = "Unknown",
+    step_number: Optional[int] = None,
+) -> str:
+    with db_timer("log_step"):
+        return await awrite(_insert_step(puzzle, session_id, hint_text, r, c, value, method_used, step_number))
 
 def get_steps_for_puzzle(puzzle: str) -> List[sqlite3.Row]:
     """Fetch all steps for a puzzle in order."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM solve_steps WHERE puzzle=? ORDER BY step_number ASC",
-        (puzzle,),
-    )
-    
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with db_timer("get_steps_for_puzzle"):
+        cur = get_connection().cursor()
+        cur.execute(
+            "SELECT * FROM solve_steps WHERE puzzle=? ORDER BY step_number ASC",
+            (puzzle,),
+        )
+        return cur.fetchall()
+
+async def aget_steps_for_puzzle(puzzle: str) -> List[sqlite3.Row]:
+    return await asyncio.to_thread(get_steps_for_puzzle, puzzle)
 
 # for testing
 if __name__ == "__main__":
     init_db()
     id = "some-id"
-    
+
     rows = get_steps_for_puzzle(id)
-    print(rows)
\ No newline at end of file
+    print(rows)
@@ -2,15 +2,21 @@
 
 # imports
 import os
+import logging
+import httpx
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
-from typing import List, Dict, Any, Optional, Literal
+from typing import List, Dict, Any, Optional, Literal, AsyncIterator
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 # local imports
 from backend.utils import get_logger, load_prompt
+from backend.services.hints import LogicalHint, describe_hint
+from backend.services.nxn import parse_board
+from backend.services.llm_cache import llm_cache, is_cacheable, make_key
+from backend.services.metrics import LLM_REQUESTS, LLM_SECONDS, record_llm_usage
 
 logger = get_logger(__name__)
 load_dotenv()
@@ -21,6 +27,7 @@ class ChatMessage(BaseModel):
     content: str
 
 INCLUDE_SOLVED = os.getenv("INCLUDE_SOLVED_BOARD_IN_PROMPT", "true").lower() == "true"
+FAST_HINTS = os.getenv("FAST_HINTS", "false").lower() == "true"
 MODEL = os.getenv("OPENAI_MODEL", "gpt-5-nano")
 SYS_PROMPT = load_prompt("system.md")
 SYS_MESSAGE = ChatMessage(role="system", content=SYS_PROMPT)
@@ -31,20 +38,85 @@ REASONING_MODELS = {
     "o4-mini",
 }
 
-def make_llm(model: str) -> ChatOpenAI:
+# connection pool shared by every LLM client (see open_llm_clients)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_MAX_RETRIES = 3     # OpenAI SDK retries (429, 5xx, connection errors)
+
+_http_client: Optional[httpx.AsyncClient] = None
+_llm_registry: Dict[str, ChatOpenAI] = {}
+_max_retries = LLM_MAX_RETRIES
+
+def make_llm(
+    model: str,
+    http_async_client: Optional[httpx.AsyncClient] = None,
+    max_retries: int = LLM_MAX_RETRIES,
+) -> ChatOpenAI:
     kwargs = dict(
         model=model,
         use_responses_api=True,
         temperature=0.2,
-        max_retries=3,
+        max_retries=max_retries,
     )
 
+    if http_async_client is not None:
+        kwargs["http_async_client"] = http_async_client
+
     if model in REASONING_MODELS:
         kwargs["reasoning"] = {"effort": "medium"}
         kwargs["verbosity"] = "low"
 
     return ChatOpenAI(**kwargs)
 
+# open the shared keep-alive pool; call once from the app lifespan
+# max_retries=0 leaves retrying to the caller (the eval runner's backoff)
+async def open_llm_clients(models: Optional[List[str]] = None, max_retries: Optional[int] = None) -> None:
+    global _http_client, _max_retries
+    if _http_client is not None:
+        return
+
+    _max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    _http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(LLM_TIMEOUT),
+    )
+
+    for model in models or [MODEL]:
+        get_llm(model)
+
+    logger.info("LLM client pool opened (max_connections=%d)", LLM_MAX_CONNECTIONS)
+
+async def close_llm_clients() -> None:
+    global _http_client, _max_retries
+    _llm_registry.clear()
+    _max_retries = LLM_MAX_RETRIES
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("LLM client pool closed")
+
+# per-model client; pooled and cached once open_llm_clients has run
+def get_llm(model: str) -> ChatOpenAI:
+    llm = _llm_registry.get(model)
+    if llm is not None:
+        return llm
+
+    llm = make_llm(model, http_async_client=_http_client, max_retries=_max_retries)
+
+    # without the shared pool (e.g. one-off scripts) keep the old per-call client
+    if _http_client is not None:
+        _llm_registry[model] = llm
+
+    return llm
+
 def build_messages(user_prompt: str) -> list[dict[str, str]]:
     return [
         {
@@ -113,11 +185,14 @@ def validate_query_params(
             detail="Board string is required as a query parameter."
         )
     
-    if len(board) != 81 or not all(c.isdigit() for c in board):
-        logger.warning(f"Invalid board string provided: {board}")
+    # 16/36/81/144/256/625 cells; 0 for empty, 1-9 then A-P above 9
+    try:
+        parse_board(board)
+    except ValueError as e:
+        logger.warning("Invalid board string provided: %s", board)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid board string. Must be exactly 81 digits (0-9)."
+            detail=f"Invalid board string. {e}"
         )
 
     if not session_id:
@@ -132,7 +207,7 @@ def validate_query_params(
     
     return messages
 
-# add board and solution to messages
+# add board and solution to messages; returns a new list, the caller's messages are untouched
 def add_board_to_messages(
         messages: List[ChatMessage],
         board: str, solution: str
@@ -152,10 +227,28 @@ def add_board_to_messages(
     board_info += ("Please provide your response based on this board.")
     
     if messages[-1].role == "user":
-        messages[-1].content += "\n\n" + board_info
+        last = messages[-1].model_copy(update={"content": messages[-1].content + "\n\n" + board_info})
+        messages = messages[:-1] + [last]
     
     return messages
 
+# pin the LLM to a move found by the local hint engine so it only explains it
+def add_hint_to_messages(
+        messages: List[ChatMessage],
+        hint: LogicalHint
+    ) -> List[ChatMessage]:
+
+    hint_info = (
+        "\n\nExplain this next move to the user; do not choose a different one:\n"
+        f"{describe_hint(hint)}"
+    )
+
+    if messages[-1].role == "user":
+        last = messages[-1].model_copy(update={"content": messages[-1].content + hint_info})
+        messages = messages[:-1] + [last]
+
+    return messages
+
 def add_board_to_dict_messages(
     messages: List[Dict[str, str]],
     board: str,
@@ -185,22 +278,54 @@ def add_board_to_dict_messages(
 
     return messages
 
+# cache key for a call, or None when the call should not be cached
+def _cache_key(
+    messages: List[Dict[str, str]],
+    model: str,
+    board: Optional[str],
+    cache: Optional[bool],
+) -> Optional[str]:
+    use_cache = is_cacheable(messages) if cache is None else cache
+    if not (llm_cache.enabled and use_cache):
+        return None
+    return make_key(model, messages, board, INCLUDE_SOLVED)
+
 # call the LLM with messages
 async def call_llm(
     messages: List[Dict[str, str]],
     model = MODEL,
+    *,
+    board: Optional[str] = None,
+    cache: Optional[bool] = None,
     ) -> str:
 
-    llm = make_llm(model)
+    # cache=None caches deterministic prompts only (see llm_cache.is_cacheable)
+    key = _cache_key(messages, model, board, cache)
+    if key is not None:
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            logger.debug("LLM cache hit.")
+            LLM_REQUESTS.labels(model, "call", "cache_hit").inc()
+            return cached
+
+    llm = get_llm(model)
 
     lc_messages = _to_lc_messages(messages)
-    resp = await llm.ainvoke(lc_messages)
+    try:
+        with LLM_SECONDS.labels(model, "call").time():
+            resp = await llm.ainvoke(lc_messages)
+    except Exception:
+        LLM_REQUESTS.labels(model, "call", "error").inc()
+        raise
+    LLM_REQUESTS.labels(model, "call", "ok").inc()
+    record_llm_usage(model, resp)
 
-    logger.debug(f"Raw LLM resp repr: {repr(resp)}")
-    logger.debug(f"Raw LLM resp content type: {type(resp.content)}")
-    logger.debug(f"Raw LLM resp content: {resp.content}")
-    logger.debug(f"Raw LLM resp additional_kwargs: {resp.additional_kwargs}")
-    logger.debug(f"Raw LLM resp response_metadata: {getattr(resp, 'response_metadata', None)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw LLM resp repr: %r", resp)
+        logger.debug("Raw LLM resp content type: %s", type(resp.content))
+        logger.debug("Raw LLM resp content: %s", resp.content)
+        logger.debug("Raw LLM resp additional_kwargs: %s", resp.additional_kwargs)
+        logger.debug("Raw LLM resp response_metadata: %s", getattr(resp, "response_metadata", None))
 
     text = _content_to_text(resp.content)
 
@@ -208,6 +333,46 @@ async def call_llm(
         logger.debug("Model returned empty content.")
         return "(no reply from model)"
 
+    if key is not None:
+        await llm_cache.aset(key, text)
+
     return text
 
+# stream the LLM reply as text chunks (reasoning blocks are skipped)
+async def stream_llm(
+    messages: List[Dict[str, str]],
+    model = MODEL,
+    *,
+    board: Optional[str] = None,
+    cache: Optional[bool] = None,
+    ) -> AsyncIterator[str]:
+
+    key = _cache_key(messages, model, board, cache)
+    if key is not None:
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            LLM_REQUESTS.labels(model, "stream", "cache_hit").inc()
+            yield cached
+            return
+
+    llm = get_llm(model)
+    parts: List[str] = []
+
+    lc_messages = _to_lc_messages(messages)
+    try:
+        with LLM_SECONDS.labels(model, "stream").time():
+            async for chunk in llm.astream(lc_messages):
+                # usage arrives on the final chunk
+                record_llm_usage(model, chunk)
+                text = _content_to_text(chunk.content)
+                if text:
+                    parts.append(text)
+                    yield text
+    except Exception:
+        LLM_REQUESTS.labels(model, "stream", "error").inc()
+        raise
+    LLM_REQUESTS.labels(model, "stream", "ok").inc()
 
+    # only complete replies are cached
+    if key is not None and "".join(parts).strip():
+        await llm_cache.aset(key, "".join(parts))
@@ -1,28 +1,150 @@
 # backend/services/analytics.py
 
 # imports
-from typing import List, Dict, Any
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from math import isqrt
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 # local imports
 from backend.database import db_driver as driver
+from backend.services.metrics import db_timer
 
-# gets all solve steps from the database
-def get_solve_steps() -> List[Dict[str, Any]]:
-    conn = driver.get_connection()  # use YOUR driver function
-    cur = conn.cursor()
+STEP_COLUMNS = (
+    "id", "puzzle", "session_id", "step_number", "hint_text",
+    "r", "c", "value", "method_used", "created_at",
+)
 
-    cur.execute("SELECT id, puzzle, session_id, step_number, hint_text, r, c, value, method_used, created_at FROM solve_steps ORDER BY id DESC")
+# rows fetched per round trip when streaming
+STREAM_CHUNK = 500
 
-    rows = cur.fetchall()
-    conn.close()
+# server-side filters for solve steps; every field is optional
+@dataclass
+class StepFilters:
+    session_id: Optional[str] = None
+    puzzle: Optional[str] = None
+    method: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+# created_at is stored by SQLite as UTC "YYYY-MM-DD HH:MM:SS"
+def _sql_time(t: datetime) -> str:
+    if t.tzinfo is not None:
+        t = t.astimezone(timezone.utc).replace(tzinfo=None)
+    return t.strftime("%Y-%m-%d %H:%M:%S")
+
+def _steps_query(
+    filters: StepFilters,
+    before_id: Optional[int],
+    limit: Optional[int],
+    include_hint_text: bool,
+) -> Tuple[str, List[Any], Tuple[str, ...]]:
+    columns = STEP_COLUMNS if include_hint_text else tuple(c for c in STEP_COLUMNS if c != "hint_text")
+    where, params = [], []
+
+    if filters.session_id is not None:
+        where.append("session_id = ?")
+        params.append(filters.session_id)
+    if filters.puzzle is not None:
+        where.append("puzzle = ?")
+        params.append(filters.puzzle)
+    if filters.method is not None:
+        where.append("method_used = ?")
+        params.append(filters.method)
+    if filters.since is not None:
+        where.append("created_at >= ?")
+        params.append(_sql_time(filters.since))
+    if filters.until is not None:
+        where.append("created_at < ?")
+        params.append(_sql_time(filters.until))
+
+    # keyset pagination: newest first, resume below the last id seen
+    if before_id is not None:
+        where.append("id < ?")
+        params.append(before_id)
+
+    sql = f"SELECT {', '.join(columns)} FROM solve_steps"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return sql, params, columns
+
+# one page of solve steps, newest first, and the cursor for the next page
+def get_solve_steps(
+    filters: Optional[StepFilters] = None,
+    before_id: Optional[int] = None,
+    limit: int = 100,
+    include_hint_text: bool = True,
+) -> Dict[str, Any]:
+    sql, params, columns = _steps_query(filters or StepFilters(), before_id, limit, include_hint_text)
+
+    # persistent per-thread connection; not closed here
+    with db_timer("get_solve_steps"):
+        cur = driver.get_connection().cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
 
     # convert to JSON
-    return [
-        {
-            "id": r[0], "puzzle": r[1], "session_id": r[2],
-            "step_number": r[3], "hint_text": r[4],
-            "r": r[5], "c": r[6], "value": r[7],
-            "method_used": r[8], "created_at": r[9]
-        }
-        for r in rows
-    ]
\ No newline at end of file
+    steps = [dict(zip(columns, r)) for r in rows]
+    return {
+        "steps": steps,
+        "next_cursor": steps[-1]["id"] if len(steps) == limit else None,
+    }
+
+# every matching step, a chunk at a time, on a connection of its own
+def iter_solve_steps(
+    filters: Optional[StepFilters] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    include_hint_text: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    sql, params, columns = _steps_query(filters or StepFilters(), before_id, limit, include_hint_text)
+
+    # the generator may resume on different threads, so it owns its connection
+    conn: sqlite3.Connection = driver.connect()
+    try:
+        cur = conn.execute(sql, params)
+        while rows := cur.fetchmany(STREAM_CHUNK):
+            for r in rows:
+                yield dict(zip(columns, r))
+    finally:
+        conn.close()
+
+# aggregate views, read from the rollup tables kept current by insert triggers
+def _rows(sql: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+    with db_timer("summary"):
+        cur = driver.get_connection().execute(sql, params)
+        rows = cur.fetchall()
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, r)) for r in rows]
+
+def get_session_summary(session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    if session_id is not None:
+        return _rows("SELECT * FROM rollup_sessions WHERE session_id = ?", (session_id,))
+    return _rows("SELECT * FROM rollup_sessions ORDER BY last_at DESC LIMIT ?", (limit,))
+
+def get_technique_summary() -> List[Dict[str, Any]]:
+    return _rows("SELECT method_used, hints FROM rollup_methods ORDER BY hints DESC")
+
+def get_difficulty_summary() -> List[Dict[str, Any]]:
+    out = []
+    for row in _rows("SELECT cells, empties, hints FROM rollup_empties ORDER BY cells, empties"):
+        cells = row.pop("cells")
+        size = isqrt(cells)
+        if size * size != cells:
+            continue  # not a board string (e.g. old rows where the id was stored as a number)
+        row["size"] = size
+        row["difficulty"] = round(row["empties"] / cells, 3)
+        out.append(row)
+    return out
+
+def get_volume_summary(granularity: str = "day", limit: int = 30) -> List[Dict[str, Any]]:
+    return _rows(
+        "SELECT period, hints FROM rollup_volume WHERE granularity = ? ORDER BY period DESC LIMIT ?",
+        (granularity, limit),
+    )
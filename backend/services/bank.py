@@ -0,0 +1,235 @@
+# backend/services/bank.py
+
+# imports
+import os
+import mmap
+import random
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Set, Tuple
+
+# local imports
+from backend.services.canonical import canonical_hash
+from backend.services.generator import generate_puzzle
+from backend.services.logic import rate
+from backend.services.parallel import bounded_map
+from backend.services.solver import CELLS, has_unique_solution
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bank file layout (little-endian):
+#   header   16 bytes   magic, version, record size, puzzle count
+#   index    82 x 8     (start, count) of the records with 0..81 empty cells
+#   records  count x 41 81 cell nibbles (0 = empty) + 1 nibble technique level
+#
+# Records are sorted by empty-cell count, so a difficulty lookup is one index
+# read plus one record read. Solutions are not stored: every puzzle has a
+# unique solution and the bitmask solver recovers it in well under a millisecond.
+MAGIC = b"SDKB"
+VERSION = 1
+RECORD_SIZE = (CELLS + 1) // 2          # 41 bytes
+HEADER = struct.Struct("<4sBB2xI4x")
+INDEX_ENTRY = struct.Struct("<II")
+INDEX_SIZE = (CELLS + 1) * INDEX_ENTRY.size
+DATA_OFFSET = HEADER.size + INDEX_SIZE
+
+# how far (in empty cells) a pick may stray from the requested difficulty
+BANK_TOLERANCE = int(os.getenv("PUZZLE_BANK_TOLERANCE", "4"))
+PUZZLE_BANK = os.getenv("PUZZLE_BANK")  # optional path to a .bank file
+
+
+@dataclass
+class BankPuzzle:
+    board: str
+    level: int
+
+
+def pack(board: str, level: int) -> bytes:
+    # one hex digit per cell is exactly one nibble; the level fills the 82nd
+    return bytes.fromhex(board.replace(".", "0") + format(level & 0xF, "x"))
+
+
+def unpack(record: bytes) -> BankPuzzle:
+    digits = record.hex()
+    return BankPuzzle(board=digits[:CELLS], level=int(digits[CELLS], 16))
+
+
+def empties_of(board: str) -> int:
+    return board.count("0") + board.count(".")
+
+
+# read-only, memory-mapped view of a bank file; pages are shared between processes
+class PuzzleBank:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} puzzle bank.")
+
+        self.count = count
+        self._index: List[Tuple[int, int]] = [
+            INDEX_ENTRY.unpack_from(self._mm, HEADER.size + i * INDEX_ENTRY.size)
+            for i in range(CELLS + 1)
+        ]
+
+        # nearest non-empty bucket for every target, within BANK_TOLERANCE
+        self._nearest: List[Optional[int]] = []
+        for target in range(CELLS + 1):
+            near = [
+                e for e in range(max(0, target - BANK_TOLERANCE), min(CELLS, target + BANK_TOLERANCE) + 1)
+                if self._index[e][1]
+            ]
+            self._nearest.append(min(near, key=lambda e: abs(e - target)) if near else None)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, index: int) -> BankPuzzle:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset = DATA_OFFSET + index * RECORD_SIZE
+        return unpack(self._mm[offset:offset + RECORD_SIZE])
+
+    def bucket(self, empties: int) -> Tuple[int, int]:
+        return self._index[empties]
+
+    # O(1) random puzzle near `difficulty` (share of empty cells), or None
+    def pick(self, difficulty: float, rng: Optional[random.Random] = None) -> Optional[str]:
+        target = min(CELLS, max(0, round(difficulty * CELLS)))
+        empties = self._nearest[target]
+        if empties is None:
+            return None
+
+        start, count = self._index[empties]
+        return self.get(start + (rng or random).randrange(count)).board
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+# spill record: 8-byte canonical hash, then the packed puzzle
+SPILL_SIZE = 8 + RECORD_SIZE
+
+
+def write_bank(path: str | Path, puzzles: Iterable[Tuple[str, int, str]]) -> int:
+    """
+    Write (board, level, canonical hash) triples to a bank file, keeping one
+    puzzle per symmetry class; returns the number stored.
+
+    Records are spilled to one temp file per empty-cell count as they arrive,
+    then deduplicated and copied out bucket by bucket. Equivalent puzzles have
+    the same number of empty cells, so only one bucket's hashes are ever held
+    in memory.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+
+    with tempfile.TemporaryDirectory(prefix=path.name + ".", dir=path.parent) as spill_dir:
+        spills = [Path(spill_dir) / f"{e:02d}" for e in range(CELLS + 1)]
+        files: List[Optional[BinaryIO]] = [None] * (CELLS + 1)
+        try:
+            for board, level, key in puzzles:
+                e = empties_of(board)
+                f = files[e]
+                if f is None:
+                    f = files[e] = spills[e].open("wb")
+                f.write(bytes.fromhex(key) + pack(board, level))
+        finally:
+            for f in files:
+                if f is not None:
+                    f.close()
+
+        index: List[Tuple[int, int]] = []
+        count = skipped = 0
+        with tmp.open("wb") as out:
+            # header and index are rewritten once the counts are known
+            out.seek(DATA_OFFSET)
+            for spill in spills:
+                n = 0
+                if spill.exists():
+                    seen: Set[bytes] = set()
+                    with spill.open("rb") as f:
+                        while rec := f.read(SPILL_SIZE * 4096):
+                            for i in range(0, len(rec), SPILL_SIZE):
+                                key = rec[i:i + 8]
+                                if key in seen:
+                                    skipped += 1
+                                    continue
+                                seen.add(key)
+                                out.write(rec[i + 8:i + SPILL_SIZE])
+                                n += 1
+                    spill.unlink()
+                index.append((count, n))
+                count += n
+
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, count))
+            for start, n in index:
+                out.write(INDEX_ENTRY.pack(start, n))
+
+    if skipped:
+        logger.info("Skipped %d puzzles equivalent to one already in the bank", skipped)
+
+    # readers that have the old file mapped keep their view
+    os.replace(tmp, path)
+    return count
+
+
+# process-pool workers; top level so they pickle under spawn
+def _generate_rated(jobs: List[Tuple[float, int]]) -> List[Tuple[str, int, str]]:
+    out = []
+    for difficulty, seed in jobs:
+        puzzle = generate_puzzle(difficulty, random.Random(seed))
+        out.append((puzzle.board, puzzle.level, canonical_hash(puzzle.board, puzzle.solution)))
+    return out
+
+
+def _rate_boards(boards: List[str]) -> List[Tuple[str, int, str]]:
+    out = []
+    for board in boards:
+        board = board.strip().replace(".", "0")
+        if len(board) != CELLS or not board.isdigit() or not has_unique_solution(board):
+            continue
+        out.append((board, rate(board).level, canonical_hash(board)))
+    return out
+
+
+def generate_bank(
+    path: str | Path,
+    count: int,
+    difficulties: Sequence[float],
+    workers: Optional[int] = None,
+    seed: int = 0,
+) -> int:
+    """Generate `count` rated puzzles spread evenly over `difficulties`."""
+    jobs = ((difficulties[i % len(difficulties)], seed * 1_000_003 + i) for i in range(count))
+    return write_bank(path, bounded_map(_generate_rated, jobs, workers))
+
+
+def build_bank_from_boards(path: str | Path, boards: Iterable[str], workers: Optional[int] = None) -> int:
+    """Validate and rate existing boards (one per line); invalid ones are skipped."""
+    return write_bank(path, bounded_map(_rate_boards, boards, workers))
+
+
+def load_bank(path: Optional[str | Path]) -> Optional[PuzzleBank]:
+    if not path:
+        return None
+    if not Path(path).exists():
+        logger.warning("Puzzle bank %s not found; generating puzzles on demand.", path)
+        return None
+
+    bank = PuzzleBank(path)
+    logger.info("Puzzle bank %s mapped (%d puzzles)", path, len(bank))
+    return bank
+
+
+puzzle_bank = load_bank(PUZZLE_BANK)
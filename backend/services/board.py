@@ -2,11 +2,15 @@
 
 # imports
 import random
+from typing import List, Sequence
 from sudoku import Sudoku
 from fastapi import HTTPException
 
 # local imports
 from backend.utils import get_logger
+from backend.services.solver import solve, solve_batch
+from backend.services.generator import generate_puzzle
+from backend.services import nxn
 
 MIN_VALID = 0.0     # 0% empty (easiest)
 MAX_VALID = 0.79    # theoretical max — you can choose 0.79 if you want unique solution
@@ -16,7 +20,7 @@ logger = get_logger(__name__)
 def validate_difficulty(difficulty: float) -> None:
     # validate difficulty
     if difficulty < MIN_VALID or difficulty > MAX_VALID:
-        logger.warning(f"Invalid difficulty requested: {difficulty}")
+        logger.warning("Invalid difficulty requested: %s", difficulty)
         raise HTTPException(
             status_code=400,
             detail=f"Invalid difficulty {difficulty}. Must be between {MIN_VALID} and {MAX_VALID}."
@@ -24,19 +28,12 @@ def validate_difficulty(difficulty: float) -> None:
 
     random.seed(random.randint(0, 10000)) # added because it was generating the same board on each request
     
-# generate a sudoku board with given difficulty
-def generate_board(difficulty=0.5) -> str:
+# generate a sudoku board with given difficulty; sizes other than 9 use the N×N engine
+def generate_board(difficulty=0.5, size: int = 9) -> str:
     seed = random.randint(0, 10000)
-    puzzle = Sudoku(3, seed=seed).difficulty(difficulty)
-
-    # convert back to string format
-    cleaned_board = [
-        [cell if cell is not None else 0 for cell in row]
-        for row in puzzle.board
-    ]
-    str_puzzle = "".join("".join(str(num) for num in row) for row in cleaned_board)
-    
-    return str_puzzle
+    if size == 9:
+        return generate_puzzle(difficulty, random.Random(seed)).board
+    return nxn.generate_puzzle(difficulty, nxn.get_shape(size), random.Random(seed))[0]
 
 def count_empties(board) -> int:
     return sum(1 for row in board for v in row if (v is None or v == 0))
@@ -55,29 +52,31 @@ def puzzle_to_str(pzl: Sudoku) -> str:
     str_solution = "".join("".join(str(num) for num in row) for row in cleaned_board)
     return str_solution
 
-# TODO: split this into two different functions where we solve and return sudoku board instead of str
-# solve a sudoku board given in string format
-def solve_board(board_str):
-    # make rows
-    board = []
-    for i in range(9):
-        row = [board_str[x] for x in range(i*9, (i+1)*9)]
-        board.append([int(num) if num != '0' else None for num in row])
-    
-    puzzle = Sudoku(3)
-    puzzle.board = board
-    puzzle = puzzle.solve()
+# solve a sudoku board given in string format; the size follows from its length
+def solve_board(board_str: str) -> str:
+    if len(board_str) == 81:
+        solution, count = solve(board_str)
+    else:
+        solution, count = nxn.solve(board_str)
 
-    if puzzle is None:
-        raise ValueError("Invalid board string; cannot be solved.")
+    if solution is None:
+        raise ValueError("The board has no solution.")
 
-    cleaned_board = [
-        [cell if cell is not None else 0 for cell in row]
-        for row in puzzle.board
-    ]
+    # hints and grading assume one answer; any solution we picked could contradict the user's
+    if count > 1:
+        raise ValueError("The board has more than one solution.")
 
-    str_solution = "".join("".join(str(num) for num in row) for row in cleaned_board)
-    return str_solution
+    return solution
+
+# solve many boards at once; raises on the first unsolvable one like solve_board
+def solve_boards(boards: Sequence[str]) -> List[str]:
+    solutions = solve_batch(boards)
+
+    for i, solution in enumerate(solutions):
+        if solution is None:
+            raise ValueError(f"Invalid board string at index {i}; cannot be solved.")
+
+    return solutions
 
 # for testing
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+# backend/services/bulk.py
+
+# imports
+import csv
+import json
+import time
+import multiprocessing
+from dataclasses import dataclass, asdict
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# local imports
+from backend.database import db_driver as driver
+from backend.services.canonical import canonical_hash, canonical_hash_or_none
+from backend.services.parallel import IN_FLIGHT_PER_WORKER, bounded_map, spawn_pool
+from backend.services.solver import CELLS, solve, solve_batch
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+# boards per worker task, and per insert transaction
+CHUNK_SIZE = 500
+BATCH_SIZE = 20000
+
+BOARD_CHARS = set("0123456789.")
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    inserted: int = 0
+    malformed: int = 0
+    unsolvable: int = 0
+    multiple: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def iter_boards(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Boards from a text stream, one at a time: either 81 cells per line or
+    nine 9-cell lines per board (as in sample.txt). Only the first field of a
+    line is read, so "board,solution" CSV rows work; '#' starts a comment.
+    """
+    pending = ""
+    for line in lines:
+        field = line.split("#", 1)[0].replace(",", " ").split()
+        if not field:
+            continue
+        cells = field[0]
+
+        # one row of a nine-line grid
+        if len(cells) == 9:
+            pending += cells
+            if len(pending) == CELLS:
+                yield pending
+                pending = ""
+            continue
+
+        # anything else stands alone; an unfinished grid is reported as malformed
+        if pending:
+            yield pending
+            pending = ""
+        yield cells
+
+    if pending:
+        yield pending
+
+
+# worker: validate, solve and hash one chunk; top level so it pickles under spawn
+def _check_chunk(boards: List[str], canonical: bool) -> List[Tuple[str, Optional[str], Optional[str], str]]:
+    out = []
+    for board in boards:
+        board = board.replace(".", "0")
+        if len(board) != CELLS or not set(board) <= BOARD_CHARS:
+            out.append((board, None, None, "malformed"))
+            continue
+
+        solution, count = solve(board, limit=2)
+        if solution is None:
+            out.append((board, None, None, "unsolvable"))
+        elif count > 1:
+            out.append((board, None, None, "multiple"))
+        else:
+            key = canonical_hash(board, solution) if canonical else None
+            out.append((board, solution, key, "ok"))
+    return out
+
+
+def _insert_batch(
+    conn,
+    rows: List[Tuple[str, str, Optional[str]]],
+    dedupe: bool,
+    stats: ImportStats,
+) -> None:
+    if dedupe:
+        # drop symmetric variants already stored or earlier in this batch
+        keys = list({key for _, _, key in rows if key is not None})
+        existing = set()
+        for i in range(0, len(keys), 900):  # stay under SQLite's variable limit
+            part = keys[i:i + 900]
+            existing.update(
+                r[0] for r in conn.execute(
+                    f"SELECT canonical_hash FROM puzzles WHERE canonical_hash IN ({','.join('?' * len(part))})",
+                    part,
+                )
+            )
+        kept = []
+        for row in rows:
+            if row[2] is not None and row[2] in existing:
+                stats.duplicates += 1
+                continue
+            existing.add(row[2])
+            kept.append(row)
+        rows = kept
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            """
+            INSERT INTO puzzles (size, box_rows, box_cols, initial_board, solution, canonical_hash)
+            VALUES (9, 3, 3, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    stats.inserted += len(rows)
+
+
+def import_puzzles(
+    lines: Iterable[str],
+    *,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    dedupe: bool = False,
+    canonical: bool = False,
+) -> ImportStats:
+    """
+    Stream boards from `lines` into the puzzles table. At most two chunks per
+    worker are in flight and one batch is buffered, so memory does not grow
+    with the input.
+
+    Canonical hashes cost more than solving, so they are computed only for
+    `dedupe` or when `canonical` asks to store them anyway.
+    """
+    canonical = canonical or dedupe
+    driver.init_db()
+    workers = workers or multiprocessing.cpu_count()
+    stats = ImportStats()
+    start = time.perf_counter()
+    checked = bounded_map(partial(_check_chunk, canonical=canonical), iter_boards(lines), workers, CHUNK_SIZE)
+    pending: List[Tuple[str, str, Optional[str]]] = []
+
+    conn = driver.connect()
+    try:
+        # _check_chunk returns one row per board, malformed ones included
+        for board, solution, key, status in checked:
+            stats.read += 1
+            if status == "ok":
+                pending.append((board, solution, key))
+            else:
+                setattr(stats, status, getattr(stats, status) + 1)
+
+            if len(pending) >= batch_size:
+                _insert_batch(conn, pending, dedupe, stats)
+                pending = []
+                stats.seconds = time.perf_counter() - start
+                logger.info("Imported %d of %d read (%.0f boards/s)", stats.inserted, stats.read, stats.rate)
+
+        if pending:
+            _insert_batch(conn, pending, dedupe, stats)
+    finally:
+        conn.close()
+
+    stats.seconds = time.perf_counter() - start
+    logger.info("Import finished: %s", asdict(stats))
+    return stats
+
+
+# worker: canonical hashes for (id, board) rows; boards that can't be hashed are left out
+def _hash_chunk(rows: List[Tuple[int, str]]) -> List[Tuple[str, int]]:
+    out = []
+    for puzzle_id, board in rows:
+        key = canonical_hash_or_none(9, board)
+        if key is not None:
+            out.append((key, puzzle_id))
+    return out
+
+
+def backfill_canonical_hashes(workers: Optional[int] = None) -> int:
+    """
+    Fill in canonical hashes for 9x9 puzzles stored without one (rows that
+    predate the column, or imports without dedupe). Runs page by page, each
+    page committed on its own, so it can be stopped and rerun; returns the
+    number of rows updated.
+    """
+    driver.init_db()
+    workers = workers or multiprocessing.cpu_count()
+    page_size = IN_FLIGHT_PER_WORKER * workers * CHUNK_SIZE
+    updated = 0
+    last_id = 0
+    start = time.perf_counter()
+
+    conn = driver.connect()
+    try:
+        with spawn_pool(workers) as ex:
+            while True:
+                rows = [
+                    (r["id"], r["initial_board"])
+                    for r in conn.execute(
+                        """
+                        SELECT id, initial_board FROM puzzles
+                        WHERE size = 9 AND canonical_hash IS NULL AND id > ?
+                        ORDER BY id LIMIT ?
+                        """,
+                        (last_id, page_size),
+                    )
+                ]
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                futures = [
+                    ex.submit(_hash_chunk, rows[i:i + CHUNK_SIZE])
+                    for i in range(0, len(rows), CHUNK_SIZE)
+                ]
+                keys = [pair for f in futures for pair in f.result()]
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany("UPDATE puzzles SET canonical_hash = ? WHERE id = ?", keys)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                updated += len(keys)
+                logger.info(
+                    "Backfilled %d canonical hashes (%.0f rows/s)",
+                    updated, updated / (time.perf_counter() - start),
+                )
+    finally:
+        conn.close()
+
+    return updated
+
+
+def _rows_with_solutions(limit: Optional[int]) -> Iterator[Dict[str, object]]:
+    # own connection: the cursor lives for the whole export
+    conn = driver.connect()
+    try:
+        sql = "SELECT id, initial_board, solution, canonical_hash FROM puzzles WHERE size = 9 ORDER BY id"
+        cur = conn.execute(sql + (" LIMIT ?" if limit else ""), (limit,) if limit else ())
+        while rows := cur.fetchmany(CHUNK_SIZE):
+            # puzzles stored before solutions were kept are solved in one batch
+            missing = [r["initial_board"] for r in rows if r["solution"] is None]
+            solved = iter(solve_batch(missing)) if missing else iter(())
+            for r in rows:
+                yield {
+                    "id": r["id"],
+                    "board": r["initial_board"],
+                    "solution": r["solution"] if r["solution"] is not None else next(solved),
+                    "canonical_hash": r["canonical_hash"],
+                }
+    finally:
+        conn.close()
+
+
+def export_puzzles(out: TextIO, fmt: str = "csv", limit: Optional[int] = None) -> int:
+    """Stream stored 9x9 puzzles and their solutions to `out`; returns the row count."""
+    count = 0
+    writer = None
+    for row in _rows_with_solutions(limit):
+        if fmt == "jsonl":
+            out.write(json.dumps(row) + "\n")
+        elif fmt == "txt":
+            out.write(f"{row['board']}\n")
+        else:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+        count += 1
+    return count
@@ -0,0 +1,161 @@
+# backend/services/canonical.py
+"""
+Canonical form of a 9x9 puzzle under the Sudoku symmetry group: digit
+relabeling, band and stack permutations, row and column permutations within
+them, and transposition (2 * 6^8 grid transforms, times 9! relabelings).
+
+Equivalent puzzles have equivalent solutions, so the work is done on the
+solution grid, where the first row always relabels to 123456789 and only the
+second row has to be minimized over all column permutations (vectorized
+below). The few transforms that give the minimal solution are then applied to
+the puzzle itself and the smallest result is the canonical form.
+"""
+
+# imports
+import hashlib
+from dataclasses import dataclass
+from itertools import permutations, product
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# local imports
+from backend.services.solver import SIZE, solve
+
+_PERMS3 = list(permutations(range(3)))
+
+# every column order reachable by permuting stacks and columns within stacks
+COL_PERMS = np.array(
+    [
+        [3 * stack + c for stack, inner in zip(stacks, (p0, p1, p2)) for c in inner]
+        for stacks in _PERMS3
+        for p0, p1, p2 in product(_PERMS3, repeat=3)
+    ],
+    dtype=np.int64,
+)
+_COL_PERMS_INV = np.argsort(COL_PERMS, axis=1)     # position of each original column
+
+
+# a symmetry: optional transpose, then rows/cols taken in the given order, then digits mapped
+@dataclass(frozen=True)
+class Transform:
+    transpose: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    digits: Tuple[int, ...]     # digits[d] is the new label of digit d; digits[0] == 0
+
+    def apply(self, board: str) -> str:
+        g = _grid(board, self.transpose)
+        return "".join(
+            str(self.digits[g[r * SIZE + c]]) for r in self.rows for c in self.cols
+        )
+
+    # new (row, col) of an original 0-based cell
+    def map_cell(self, r: int, c: int) -> Tuple[int, int]:
+        if self.transpose:
+            r, c = c, r
+        return self.rows.index(r), self.cols.index(c)
+
+
+def _grid(board: str, transpose: bool) -> List[int]:
+    g = [0 if ch in "0." else int(ch) for ch in board]
+    if transpose:
+        g = [g[c * SIZE + r] for r in range(SIZE) for c in range(SIZE)]
+    return g
+
+
+# minimal transforms of a complete solution grid, and the minimal grid itself
+def _solution_transforms(solution: str) -> Tuple[str, List[Transform]]:
+    choices, fs = [], []
+
+    for transpose in (False, True):
+        g = np.array(_grid(solution, transpose), dtype=np.int64).reshape(SIZE, SIZE)
+        col_of = np.zeros((SIZE, SIZE + 1), dtype=np.int64)  # col_of[r, v]: column of v in row r
+        col_of[np.arange(SIZE)[:, None], g] = np.arange(SIZE)[None, :]
+
+        for r0 in range(SIZE):
+            band = r0 // 3
+            for r1 in range(3 * band, 3 * band + 3):
+                if r1 != r0:
+                    fs.append(col_of[r0, g[r1]])
+                    choices.append((transpose, r0, r1, g))
+
+    # relabeling makes the first row read 1..9, so the second row becomes a
+    # column permutation conjugated by the column order. Find the smallest one
+    # a cell at a time, keeping only candidates tied so far
+    f = np.stack(fs)                                        # (36, 9)
+    ci = np.repeat(np.arange(len(fs)), len(COL_PERMS))
+    pi = np.tile(np.arange(len(COL_PERMS)), len(fs))
+    for j in range(SIZE):
+        vals = _COL_PERMS_INV[pi, f[ci, COL_PERMS[pi, j]]]
+        keep = vals == vals.min()
+        ci, pi = ci[keep], pi[keep]
+
+    candidates: List[Tuple[str, Transform]] = []
+    for i, p in zip(ci, pi):
+        transpose, r0, r1, g = choices[i]
+        cols = COL_PERMS[p]
+
+        digits = [0] * (SIZE + 1)
+        for j, c in enumerate(cols):
+            digits[g[r0, c]] = j + 1
+        relabeled = [
+            "".join(str(digits[g[r, c]]) for c in cols) for r in range(SIZE)
+        ]
+
+        # rows of a full grid are distinct, so the rest is fixed greedily
+        band = r0 // 3
+        rows = [r0, r1, next(r for r in range(3 * band, 3 * band + 3) if r not in (r0, r1))]
+        bands = [b for b in range(3) if b != band]
+        while bands:
+            first = min((r for b in bands for r in range(3 * b, 3 * b + 3)), key=lambda r: relabeled[r])
+            b = first // 3
+            bands.remove(b)
+            rows += sorted(range(3 * b, 3 * b + 3), key=lambda r: relabeled[r])
+
+        grid = "".join(relabeled[r] for r in rows)
+        candidates.append((grid, Transform(transpose, tuple(rows), tuple(int(c) for c in cols), tuple(digits))))
+
+    canon = min(grid for grid, _ in candidates)
+    return canon, [t for grid, t in candidates if grid == canon]
+
+
+@dataclass
+class Canonical:
+    board: str          # canonical puzzle
+    solution: str       # its solution
+    transform: Transform  # maps the input board onto `board`
+
+
+def canonicalize(board: str, solution: Optional[str] = None) -> Canonical:
+    """
+    Canonical representative of `board`. Invariance is exact for puzzles with
+    a unique solution; otherwise the first solution found is used.
+    """
+    if solution is None:
+        solution, _ = solve(board, limit=1)
+        if solution is None:
+            raise ValueError("Invalid board string; cannot be solved.")
+
+    _, transforms = _solution_transforms(solution)
+    canon_board, transform = min(((t.apply(board), t) for t in transforms), key=lambda x: x[0])
+    return Canonical(board=canon_board, solution=transform.apply(solution), transform=transform)
+
+
+def canonical_form(board: str, solution: Optional[str] = None) -> str:
+    return canonicalize(board, solution).board
+
+
+# short stable key for equivalence classes (indexes, dedup sets, caches)
+def canonical_hash(board: str, solution: Optional[str] = None) -> str:
+    return hashlib.blake2b(canonical_form(board, solution).encode("ascii"), digest_size=8).hexdigest()
+
+
+# hashes exist for solvable 9x9 boards only; anything else is stored without one
+def canonical_hash_or_none(size: int, board: str) -> Optional[str]:
+    if size != SIZE:
+        return None
+    try:
+        return canonical_hash(board)
+    except ValueError:
+        return None
@@ -0,0 +1,128 @@
+# backend/services/generator.py
+
+# imports
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# local imports
+from backend.services.logic import (
+    LEVEL_LOCKED, LEVEL_PAIRS, LEVEL_SINGLES, LEVEL_SWORDFISH, Rating, rate_grid,
+)
+from backend.services.solver import (
+    ALL_DIGITS, CELLS, PEERS, SIZE, UNITS, grid_to_str, solve_grid,
+)
+
+# best-of-N attempts when a harder puzzle is wanted than the first one dug
+MAX_ATTEMPTS = 4
+
+
+# a generated puzzle with its unique solution and technique rating
+@dataclass
+class GeneratedPuzzle:
+    board: str
+    solution: str
+    technique: str
+    level: int
+
+
+# map the 0.0-0.79 difficulty slider to (min, max) technique levels
+def technique_bounds(difficulty: float) -> Tuple[int, int]:
+    if difficulty < 0.35:
+        return LEVEL_SINGLES, LEVEL_SINGLES
+    if difficulty < 0.6:
+        return LEVEL_SINGLES, LEVEL_PAIRS
+    return LEVEL_LOCKED, LEVEL_SWORDFISH
+
+
+# random complete grid: shuffle the three independent diagonal boxes, then solve
+def random_solution(rng: random.Random) -> List[int]:
+    grid = [0] * CELLS
+    for b in (0, 4, 8):
+        digits = rng.sample(range(1, SIZE + 1), SIZE)
+        for i, d in zip(UNITS[2 * SIZE + b], digits):
+            grid[i] = d
+
+    solution, _ = solve_grid(grid, limit=1)
+    return solution
+
+
+# would the puzzle still be solvable with `cell` holding something other than `digit`?
+def _has_other_solution(grid: List[int], cell: int, digit: int) -> bool:
+    used = 0
+    for p in PEERS[cell]:
+        if grid[p]:
+            used |= 1 << (grid[p] - 1)
+
+    others = ALL_DIGITS & ~used & ~(1 << (digit - 1))
+    try:
+        for d in range(1, SIZE + 1):
+            if others >> (d - 1) & 1:
+                grid[cell] = d
+                if solve_grid(grid, limit=1)[1]:
+                    return True
+        return False
+    finally:
+        grid[cell] = 0
+
+
+# remove givens one at a time, keeping each removal only if the solution stays unique
+def _dig(
+    solution: List[int],
+    target_empties: int,
+    max_level: int,
+    rng: random.Random,
+) -> Tuple[List[int], Rating]:
+    grid = solution[:]
+    order = list(range(CELLS))
+    rng.shuffle(order)
+
+    empties = 0
+    rating = Rating("None", 0, solved=True)
+    for cell in order:
+        if empties >= target_empties:
+            break
+
+        digit = grid[cell]
+        grid[cell] = 0
+        if _has_other_solution(grid, cell, digit):
+            grid[cell] = digit
+            continue
+
+        new_rating = rate_grid(grid, max_level)
+        if not new_rating.solved:
+            grid[cell] = digit
+            continue
+
+        rating = new_rating
+        empties += 1
+
+    return grid, rating
+
+
+def generate_puzzle(difficulty: float = 0.5, rng: Optional[random.Random] = None) -> GeneratedPuzzle:
+    """
+    Generate a puzzle with exactly one solution. `difficulty` sets the share
+    of empty cells to aim for and the band of techniques the solve may need;
+    the puzzle is rated by the hardest technique it actually requires.
+    """
+    rng = rng or random.Random()
+    min_level, max_level = technique_bounds(difficulty)
+    target_empties = round(difficulty * CELLS)
+
+    best: Optional[GeneratedPuzzle] = None
+    for _ in range(MAX_ATTEMPTS):
+        solution = random_solution(rng)
+        grid, rating = _dig(solution, target_empties, max_level, rng)
+
+        if best is None or rating.level > best.level:
+            best = GeneratedPuzzle(
+                board=grid_to_str(grid),
+                solution=grid_to_str(solution),
+                technique=rating.technique,
+                level=rating.level,
+            )
+        if best.level >= min_level:
+            break
+
+    return best
@@ -1,9 +1,17 @@
 # backend/services/hints.py
 
 # imports
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from math import isqrt
+from typing import List, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from pydantic.v1 import BaseModel, Field
-from backend.utils import load_prompt
+from backend.utils import load_prompt, get_logger
+from backend.services.logic import CandidateGrid, next_step
+from backend.services.solver import SIZE, parse_board
 
 # model for extracted hint fields
 class HintExtraction(BaseModel):
@@ -16,21 +24,227 @@ class HintExtraction(BaseModel):
     )
 
 
-# cheap small model
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-)
+# structured LLM for extracting hint fields; built on first use so that
+# OPENAI_BASE_URL (e.g. the eval mock server) can be set after import
+@lru_cache(maxsize=1)
+def get_structured_llm():
+    # cheap small model
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+    )
+    return llm.with_structured_output(
+        HintExtraction,
+        method="function_calling",
+    )
+
+logger = get_logger(__name__)
+
+# move formats, e.g. "R3C7 = 8", "**R3C7**: 8", "place 8 in R3C7", "row 3, column 7 is 8"
+_SEP = r"\s*\**\s*(?:=|:|is|must\s+be|->|→|gets|becomes|can\s+only\s+be)\s*\**\s*"
+MOVE_PATTERNS = [
+    re.compile(r"\bR\s*(?P<r>[1-9])\s*C\s*(?P<c>[1-9])" + _SEP + r"(?P<v>[1-9])\b", re.I),
+    re.compile(
+        r"\b(?:place|put|enter|write|fill\s+in)\s+(?:an?\s+|the\s+)?\**(?P<v>[1-9])\**"
+        r"\s+(?:in|into|at)\s+(?:cell\s+)?\**R\s*(?P<r>[1-9])\s*C\s*(?P<c>[1-9])\b",
+        re.I,
+    ),
+    re.compile(
+        r"\brow\s*(?P<r>[1-9])\s*,?\s*(?:and\s+)?col(?:umn)?\s*(?P<c>[1-9])\b\)?" + _SEP + r"(?P<v>[1-9])\b",
+        re.I,
+    ),
+]
 
-# structured LLM for extracting hint fields
-structured_llm = llm.with_structured_output(
-    HintExtraction,
-    method="function_calling",
+# canonical technique names and the spellings models use for them
+TECHNIQUE_VOCAB = [
+    ("Naked Single", [r"naked\s+singles?", r"sole\s+candidate", r"only\s+candidate", r"single\s+candidate"]),
+    ("Hidden Single", [r"hidden\s+singles?", r"unique\s+candidate", r"last\s+remaining\s+cell"]),
+    ("Full House", [r"full\s+house"]),
+    ("Pointing Pair", [r"pointing\s+pairs?"]),
+    ("Pointing Triple", [r"pointing\s+triples?"]),
+    ("Box/Line Reduction", [r"box\s*[-/–]?\s*line(?:\s+reduction)?", r"claiming\s+(?:pairs?|triples?)"]),
+    ("Locked Candidates", [r"locked\s+candidates?"]),
+    ("Naked Pair", [r"naked\s+pairs?"]),
+    ("Naked Triple", [r"naked\s+triples?"]),
+    ("Naked Quad", [r"naked\s+quads?"]),
+    ("Hidden Pair", [r"hidden\s+pairs?"]),
+    ("Hidden Triple", [r"hidden\s+triples?"]),
+    ("Hidden Quad", [r"hidden\s+quads?"]),
+    ("XYZ-Wing", [r"xyz\s*-?\s*wing"]),
+    ("XY-Wing", [r"xy\s*-?\s*wing", r"y\s*-?\s*wing"]),
+    ("X-Wing", [r"x\s*-?\s*wing"]),
+    ("Swordfish", [r"sword\s*-?\s*fish"]),
+    ("Jellyfish", [r"jelly\s*-?\s*fish"]),
+    ("Simple Coloring", [r"(?:simple\s+)?colou?ring"]),
+    ("Unique Rectangle", [r"unique\s+rectangles?"]),
+    ("Trial and Error", [r"trial\s+and\s+error", r"backtracking"]),
+]
+TECHNIQUE_PATTERN = re.compile(
+    "|".join(
+        rf"(?P<t{i}>\b(?:{'|'.join(spellings)})\b)"
+        for i, (_, spellings) in enumerate(TECHNIQUE_VOCAB)
+    ),
+    re.I,
 )
 
-# extract hint fields from ChatGPT response
-def extract_hint_fields(chatgpt_response: str) -> HintExtraction:
+# how hints were extracted: "parsed" locally or via the LLM "fallback";
+# with a solution, also whether the extracted move was "correct" or "incorrect"
+extraction_stats: Counter = Counter()
+
+
+def match_technique(text: str) -> str:
+    # the first technique the text names is the one the hint is built on
+    m = TECHNIQUE_PATTERN.search(text)
+    if m is None:
+        return "Unknown"
+    return TECHNIQUE_VOCAB[int(m.lastgroup[1:])][0]
+
+
+def parse_hint_text(text: str) -> Optional[HintExtraction]:
+    """
+    Pull r, c, value and method_used out of a hint reply without the LLM.
+    When several moves are mentioned, the first one stated is the hint, right
+    or wrong. Returns None when no move can be found.
+    """
+    moves = []
+    for pattern in MOVE_PATTERNS:
+        for m in pattern.finditer(text):
+            moves.append((m.start(), int(m["r"]), int(m["c"]), int(m["v"])))
+    if not moves:
+        return None
+
+    _, r, c, v = min(moves)
+    return HintExtraction(r=r, c=c, value=v, method_used=match_technique(text))
+
+
+# does the hint fill an empty cell with its solved digit?
+def is_correct_hint(hint: HintExtraction, board: Optional[str], solution: str) -> bool:
+    size = isqrt(len(solution))
+    if not (1 <= hint.r <= size and 1 <= hint.c <= size):
+        return False
+    idx = (hint.r - 1) * size + (hint.c - 1)
+    is_empty = board is None or board[idx] in "0."
+    return is_empty and solution[idx] == str(hint.value)
+
+
+# count how the hint was extracted and, given a solution, whether it is right
+def _record(hint: HintExtraction, how: str, board: Optional[str], solution: Optional[str]) -> HintExtraction:
+    extraction_stats[how] += 1
+    if solution is not None:
+        extraction_stats["correct" if is_correct_hint(hint, board, solution) else "incorrect"] += 1
+    return hint
+
+
+def _extraction_prompt(chatgpt_response: str) -> str:
     template = load_prompt("parse_hint.md")
-    full_prompt = template.replace("<<<HINT_TEXT>>>", chatgpt_response)
+    return template.replace("<<<HINT_TEXT>>>", chatgpt_response)
+
+# extract hint fields from ChatGPT response, falling back to the LLM parser
+def extract_hint_fields(
+    chatgpt_response: str,
+    board: Optional[str] = None,
+    solution: Optional[str] = None,
+) -> HintExtraction:
+    hint = parse_hint_text(chatgpt_response)
+    if hint is not None:
+        return _record(hint, "parsed", board, solution)
+
+    logger.info("Local hint parser found no move; falling back to LLM extraction.")
+    hint = get_structured_llm().invoke(_extraction_prompt(chatgpt_response))
+    return _record(hint, "fallback", board, solution)
+
+# async variant for request handlers and the eval runner
+async def aextract_hint_fields(
+    chatgpt_response: str,
+    board: Optional[str] = None,
+    solution: Optional[str] = None,
+) -> HintExtraction:
+    hint = parse_hint_text(chatgpt_response)
+    if hint is not None:
+        return _record(hint, "parsed", board, solution)
+
+    logger.info("Local hint parser found no move; falling back to LLM extraction.")
+    hint = await get_structured_llm().ainvoke(_extraction_prompt(chatgpt_response))
+    return _record(hint, "fallback", board, solution)
+
+# a deduction found by the local step solver, 1-based like HintExtraction
+@dataclass
+class LogicalHint:
+    r: int
+    c: int
+    value: int
+    method_used: str                                # technique that places the digit
+    unit: Optional[str] = None                      # e.g. "box 5" for hidden singles
+    eliminations: List[Tuple[int, int, int]] = field(default_factory=list)  # (r, c, digit)
+    eliminated_by: List[str] = field(default_factory=list)  # techniques behind them
+    hardest_technique: Optional[str] = None         # hardest step in the chain, placement included
+
+
+def _unit_name(u: int) -> str:
+    kind = ("row", "column", "box")[u // SIZE]
+    return f"{kind} {u % SIZE + 1}"
+
+
+# find the next placement with human techniques; None if the board is wrong or stuck
+def find_logical_hint(board: str, solution: str) -> Optional[LogicalHint]:
+    values = parse_board(board)
+    if any(v and str(v) != s for v, s in zip(values, solution)):
+        return None  # the player has a mistake on the board
+
+    g = CandidateGrid(values)
+    eliminations: List[Tuple[int, int, int]] = []
+    eliminated_by: List[str] = []
+    hardest = None
+
+    while not g.is_solved():
+        step = next_step(g)
+        if step is None:
+            return None
+
+        if hardest is None or step.level > hardest.level:
+            hardest = step
+
+        if step.cell is None:
+            eliminations += [(cell // SIZE + 1, cell % SIZE + 1, d) for cell, d in step.eliminations]
+            if step.technique not in eliminated_by:
+                eliminated_by.append(step.technique)
+            g.apply(step)
+            continue
+
+        # never hand out a placement that disagrees with the solved board
+        if str(step.value) != solution[step.cell]:
+            return None
+
+        return LogicalHint(
+            r=step.cell // SIZE + 1,
+            c=step.cell % SIZE + 1,
+            value=step.value,
+            method_used=step.technique,
+            unit=_unit_name(step.unit) if step.unit is not None else None,
+            eliminations=eliminations,
+            eliminated_by=eliminated_by,
+            hardest_technique=hardest.technique,
+        )
+
+    return None
+
+
+# plain-text explanation of a logical hint, used when the LLM is skipped
+def describe_hint(hint: LogicalHint) -> str:
+    cell = f"R{hint.r}C{hint.c}"
+    parts = []
+
+    if hint.eliminations:
+        removed = ", ".join(f"{d} from R{r}C{c}" for r, c, d in hint.eliminations[:6])
+        if len(hint.eliminations) > 6:
+            removed += f" and {len(hint.eliminations) - 6} more"
+        parts.append(f"Using {' and '.join(hint.eliminated_by)}, remove candidate {removed}.")
+
+    lead = "Then " if parts else ""
+    if hint.unit:
+        parts.append(f"{lead}{hint.value} has only one possible place in {hint.unit}: {cell}.")
+    else:
+        parts.append(f"{lead}{cell} has only one candidate left: {hint.value}.")
 
-    return structured_llm.invoke(full_prompt)
\ No newline at end of file
+    parts.append(f"**{cell} = {hint.value}** ({hint.method_used}).")
+    return " ".join(parts)
@@ -0,0 +1,180 @@
+# backend/services/llm_cache.py
+
+# imports
+import os
+import asyncio
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# local imports
+from backend.config.hints import SINGLE_HINT
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")  # optional SQLite file for a persistent tier
+
+
+# only prompts with one right answer are safe to replay
+def is_cacheable(messages: List[Dict[str, str]]) -> bool:
+    users = [m for m in messages if m.get("role") == "user"]
+    return bool(users) and SINGLE_HINT in users[-1].get("content", "")
+
+
+def make_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    board: Optional[str],
+    include_solved: bool,
+) -> str:
+    normalized = [[m.get("role", "user"), " ".join(m.get("content", "").split())] for m in messages]
+    payload = json.dumps(
+        {"model": model, "messages": normalized, "board": board, "include_solved": include_solved},
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# in-memory LRU with TTL in front of an optional SQLite tier
+class LLMCache:
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        db_path: Optional[str | Path] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # the SQLite tier is used from worker threads
+
+        if db_path:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key         TEXT PRIMARY KEY,
+                    response    TEXT NOT NULL,
+                    created_at  REAL NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    # in-memory tier only; safe to call on the event loop
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+            return None
+
+    # blocking SQLite read; promotes a fresh row into memory
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        with self._lock:
+            if row is not None and row[1] + self.ttl > now:
+                self._stats["disk_hits"] += 1
+                self._remember(key, row[0], row[1] + self.ttl)
+                return row[0]
+            self._stats["misses"] += 1
+            return None
+
+    def _miss(self) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def _set_memory(self, key: str, value: str, now: float) -> None:
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(key, value, now + self.ttl)
+
+    # blocking SQLite write
+    def _set_disk(self, key: str, value: str, now: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        if self._db is not None:
+            return self._get_disk(key, now)
+        self._miss()
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            self._set_disk(key, value, now)
+
+    # async variants for the request path: the SQLite tier runs in a worker thread
+    async def aget(self, key: str) -> Optional[str]:
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        if self._db is not None:
+            return await asyncio.to_thread(self._get_disk, key, now)
+        self._miss()
+        return None
+
+    async def aset(self, key: str, value: str) -> None:
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, now)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+
+llm_cache = LLMCache(db_path=LLM_CACHE_DB, enabled=LLM_CACHE_ENABLED)
@@ -0,0 +1,316 @@
+# backend/services/logic.py
+
+# imports
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# local imports
+from backend.services.solver import (
+    ALL_DIGITS, BIT_TO_DIGIT, BOX_OF, CELLS, COL_OF, PEERS, POPCOUNT, ROW_OF, SIZE,
+    UNITS, parse_board,
+)
+
+# difficulty level of each technique family (higher = harder)
+LEVEL_SINGLES = 1
+LEVEL_LOCKED = 2
+LEVEL_PAIRS = 3
+LEVEL_TRIPLES = 4
+LEVEL_X_WING = 5
+LEVEL_SWORDFISH = 6
+LEVEL_BACKTRACKING = 7  # no supported technique applies
+
+BACKTRACKING = "Trial and Error"
+
+ROW_UNITS = range(0, SIZE)
+COL_UNITS = range(SIZE, 2 * SIZE)
+BOX_UNITS = range(2 * SIZE, 3 * SIZE)
+
+
+# one logical deduction: either a placement or a set of candidate eliminations
+@dataclass
+class Step:
+    technique: str
+    level: int
+    cell: Optional[int] = None      # 0-based cell index of a placement
+    value: Optional[int] = None     # digit placed
+    unit: Optional[int] = None      # index into UNITS the deduction was made in
+    eliminations: List[Tuple[int, int]] = field(default_factory=list)  # (cell, digit)
+
+
+# result of grading a puzzle by the techniques it needs
+@dataclass
+class Rating:
+    technique: str
+    level: int
+    solved: bool
+
+
+def _digits(mask: int) -> Iterator[int]:
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield BIT_TO_DIGIT[bit]
+
+
+# board values plus pencil-mark candidates as bitmasks (0 for filled cells)
+class CandidateGrid:
+    __slots__ = ("values", "cands")
+
+    def __init__(self, values: List[int]) -> None:
+        self.values = list(values)
+        self.cands = [0] * CELLS
+        for i, v in enumerate(self.values):
+            if not v:
+                used = 0
+                for p in PEERS[i]:
+                    if self.values[p]:
+                        used |= 1 << (self.values[p] - 1)
+                self.cands[i] = ALL_DIGITS & ~used
+
+    @classmethod
+    def from_str(cls, board_str: str) -> "CandidateGrid":
+        return cls(parse_board(board_str))
+
+    def place(self, cell: int, digit: int) -> None:
+        bit = 1 << (digit - 1)
+        self.values[cell] = digit
+        self.cands[cell] = 0
+        for p in PEERS[cell]:
+            self.cands[p] &= ~bit
+
+    def apply(self, step: Step) -> None:
+        if step.cell is not None:
+            self.place(step.cell, step.value)
+        for cell, digit in step.eliminations:
+            self.cands[cell] &= ~(1 << (digit - 1))
+
+    def is_solved(self) -> bool:
+        return all(self.values)
+
+    def is_broken(self) -> bool:
+        return any(not v and not c for v, c in zip(self.values, self.cands))
+
+
+def _naked_single(g: CandidateGrid) -> Optional[Step]:
+    for i, m in enumerate(g.cands):
+        if m and not m & (m - 1):
+            return Step("Naked Single", LEVEL_SINGLES, cell=i, value=BIT_TO_DIGIT[m])
+    return None
+
+
+def _hidden_single(g: CandidateGrid) -> Optional[Step]:
+    c = g.cands
+    # boxes first, which is where players usually look
+    for u in (*BOX_UNITS, *ROW_UNITS, *COL_UNITS):
+        once = twice = 0
+        for i in UNITS[u]:
+            twice |= once & c[i]
+            once |= c[i]
+
+        hidden = once & ~twice
+        if not hidden:
+            continue
+
+        bit = hidden & -hidden
+        for i in UNITS[u]:
+            if c[i] & bit:
+                return Step(
+                    "Hidden Single", LEVEL_SINGLES, cell=i, value=BIT_TO_DIGIT[bit], unit=u,
+                )
+    return None
+
+
+# pointing pairs/triples (box -> line) and box/line reduction (line -> box)
+def _locked_candidates(g: CandidateGrid) -> Optional[Step]:
+    c = g.cands
+
+    for b in BOX_UNITS:
+        box = b - 2 * SIZE
+        for d in range(1, SIZE + 1):
+            bit = 1 << (d - 1)
+            cells = [i for i in UNITS[b] if c[i] & bit]
+            if len(cells) < 2:
+                continue
+
+            for line_of, offset in ((ROW_OF, 0), (COL_OF, SIZE)):
+                lines = {line_of[i] for i in cells}
+                if len(lines) != 1:
+                    continue
+                line = offset + lines.pop()
+                elims = [(i, d) for i in UNITS[line] if BOX_OF[i] != box and c[i] & bit]
+                if elims:
+                    name = "Pointing Pair" if len(cells) == 2 else "Pointing Triple"
+                    return Step(name, LEVEL_LOCKED, unit=b, eliminations=elims)
+
+    for u in (*ROW_UNITS, *COL_UNITS):
+        for d in range(1, SIZE + 1):
+            bit = 1 << (d - 1)
+            cells = [i for i in UNITS[u] if c[i] & bit]
+            if len(cells) < 2:
+                continue
+
+            boxes = {BOX_OF[i] for i in cells}
+            if len(boxes) != 1:
+                continue
+            line = set(UNITS[u])
+            box = UNITS[2 * SIZE + boxes.pop()]
+            elims = [(i, d) for i in box if i not in line and c[i] & bit]
+            if elims:
+                return Step("Box/Line Reduction", LEVEL_LOCKED, unit=u, eliminations=elims)
+
+    return None
+
+
+def _naked_subset(k: int, name: str, level: int) -> Callable[[CandidateGrid], Optional[Step]]:
+    def find(g: CandidateGrid) -> Optional[Step]:
+        c = g.cands
+        for u, unit in enumerate(UNITS):
+            open_cells = [i for i in unit if c[i]]
+            small = [i for i in open_cells if 2 <= POPCOUNT[c[i]] <= k]
+            for combo in combinations(small, k):
+                union = 0
+                for i in combo:
+                    union |= c[i]
+                if POPCOUNT[union] != k:
+                    continue
+
+                elims = [
+                    (i, d)
+                    for i in open_cells if i not in combo
+                    for d in _digits(c[i] & union)
+                ]
+                if elims:
+                    return Step(name, level, unit=u, eliminations=elims)
+        return None
+
+    return find
+
+
+def _hidden_subset(k: int, name: str, level: int) -> Callable[[CandidateGrid], Optional[Step]]:
+    def find(g: CandidateGrid) -> Optional[Step]:
+        c = g.cands
+        for u, unit in enumerate(UNITS):
+            # positions (bit p = unit[p]) where each digit can still go
+            where = {}
+            for d in range(1, SIZE + 1):
+                bit = 1 << (d - 1)
+                pos = 0
+                for p, i in enumerate(unit):
+                    if c[i] & bit:
+                        pos |= 1 << p
+                if 2 <= POPCOUNT[pos] <= k:
+                    where[d] = pos
+
+            for combo in combinations(where, k):
+                union = 0
+                for d in combo:
+                    union |= where[d]
+                if POPCOUNT[union] != k:
+                    continue
+
+                keep = 0
+                for d in combo:
+                    keep |= 1 << (d - 1)
+                elims = [
+                    (unit[p], d)
+                    for p in range(SIZE) if union >> p & 1
+                    for d in _digits(c[unit[p]] & ~keep)
+                ]
+                if elims:
+                    return Step(name, level, unit=u, eliminations=elims)
+        return None
+
+    return find
+
+
+# X-Wing (k=2) / Swordfish (k=3) on rows and on columns
+def _fish(k: int, name: str, level: int) -> Callable[[CandidateGrid], Optional[Step]]:
+    def find(g: CandidateGrid) -> Optional[Step]:
+        c = g.cands
+        for d in range(1, SIZE + 1):
+            bit = 1 << (d - 1)
+            for by_rows in (True, False):
+                def cell(line: int, pos: int) -> int:
+                    return line * SIZE + pos if by_rows else pos * SIZE + line
+
+                spots = {}
+                for line in range(SIZE):
+                    mask = 0
+                    for pos in range(SIZE):
+                        if c[cell(line, pos)] & bit:
+                            mask |= 1 << pos
+                    if 2 <= POPCOUNT[mask] <= k:
+                        spots[line] = mask
+
+                for combo in combinations(spots, k):
+                    union = 0
+                    for line in combo:
+                        union |= spots[line]
+                    if POPCOUNT[union] != k:
+                        continue
+
+                    elims = [
+                        (cell(line, pos), d)
+                        for pos in range(SIZE) if union >> pos & 1
+                        for line in range(SIZE)
+                        if line not in combo and c[cell(line, pos)] & bit
+                    ]
+                    if elims:
+                        return Step(name, level, eliminations=elims)
+        return None
+
+    return find
+
+
+# techniques in the order a player would try them
+TECHNIQUES: List[Callable[[CandidateGrid], Optional[Step]]] = [
+    _naked_single,
+    _hidden_single,
+    _locked_candidates,
+    _naked_subset(2, "Naked Pair", LEVEL_PAIRS),
+    _hidden_subset(2, "Hidden Pair", LEVEL_PAIRS),
+    _naked_subset(3, "Naked Triple", LEVEL_TRIPLES),
+    _hidden_subset(3, "Hidden Triple", LEVEL_TRIPLES),
+    _fish(2, "X-Wing", LEVEL_X_WING),
+    _fish(3, "Swordfish", LEVEL_SWORDFISH),
+]
+
+
+# easiest deduction available on the grid, or None if stuck
+def next_step(g: CandidateGrid, max_level: int = LEVEL_SWORDFISH) -> Optional[Step]:
+    for technique in TECHNIQUES:
+        step = technique(g)
+        if step is not None:
+            if step.level > max_level:
+                return None
+            return step
+    return None
+
+
+def rate_grid(values: List[int], max_level: int = LEVEL_SWORDFISH) -> Rating:
+    """
+    Solve with human techniques, easiest first, and report the hardest one
+    needed. Puzzles that need more than `max_level` rate as backtracking.
+    """
+    g = CandidateGrid(values)
+    hardest = Rating("None", 0, solved=g.is_solved())
+
+    while not g.is_solved():
+        if g.is_broken():
+            return Rating(BACKTRACKING, LEVEL_BACKTRACKING, solved=False)
+
+        step = next_step(g, max_level)
+        if step is None:
+            return Rating(BACKTRACKING, LEVEL_BACKTRACKING, solved=False)
+
+        if step.level > hardest.level:
+            hardest = Rating(step.technique, step.level, solved=False)
+        g.apply(step)
+
+    hardest.solved = True
+    return hardest
+
+
+def rate(board_str: str, max_level: int = LEVEL_SWORDFISH) -> Rating:
+    return rate_grid(parse_board(board_str), max_level)
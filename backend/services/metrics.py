@@ -0,0 +1,288 @@
+# backend/services/metrics.py
+"""
+In-process counters and histograms, rendered in the Prometheus text format
+at /metrics.
+
+Recording is a dict lookup (skipped when a labeled child is bound up front),
+a bisect over the bucket bounds and a few additions under an uncontended
+lock, around half a microsecond. Rendering happens only when /metrics is scraped.
+"""
+
+# imports
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# latency buckets in seconds: 1ms .. 60s
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """The child for these label values; bind it once for hot paths."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def render(self, name: str, names: Sequence[str], values: Sequence[str]) -> List[str]:
+        return [f"{name}{_labels(names, values)} {_num(self._value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild") -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def render(self, name: str, names: Sequence[str], values: Sequence[str]) -> List[str]:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._bounds + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(names, values, f'le=\"{_num(bound)}\"')} {cumulative}")
+        lines.append(f"{name}_sum{_labels(names, values)} {_num(total)}")
+        lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, doc, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# the app's metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "sudoku_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_SECONDS = Histogram(
+    "sudoku_http_request_seconds", "HTTP request time to the last body byte.", ("method", "route")
+)
+
+QUERY_STAGE_SECONDS = Histogram(
+    "sudoku_query_stage_seconds", "Time spent in each stage of an /ai/query request.", ("stage",)
+)
+
+BOARD_SECONDS = Histogram(
+    "sudoku_board_seconds", "Time to produce a new board, by where it came from.", ("source",)
+)
+BOARDS_SERVED = Counter(
+    "sudoku_boards_served_total", "New boards served, by source and size.", ("source", "size")
+)
+
+DB_SECONDS = Histogram("sudoku_db_seconds", "DB driver call time, queueing included.", ("op",))
+DB_COMMIT_SECONDS = Histogram("sudoku_db_commit_seconds", "Writer thread group-commit time.")
+DB_COMMIT_BATCH = Histogram(
+    "sudoku_db_commit_batch_size", "Writes per group commit.", buckets=SIZE_BUCKETS
+)
+
+LLM_REQUESTS = Counter(
+    "sudoku_llm_requests_total", "LLM calls by outcome (ok, error, cache_hit).", ("model", "mode", "outcome")
+)
+LLM_SECONDS = Histogram(
+    "sudoku_llm_seconds", "LLM call time; to the last chunk when streaming.", ("model", "mode")
+)
+LLM_TOKENS = Counter(
+    "sudoku_llm_tokens_total", "LLM tokens reported by the API (input, output, reasoning).", ("model", "kind")
+)
+
+
+def stage(name: str) -> _Timer:
+    return QUERY_STAGE_SECONDS.labels(name).time()
+
+
+def db_timer(op: str) -> _Timer:
+    return DB_SECONDS.labels(op).time()
+
+
+def _usage_of(msg: Any) -> Optional[Dict[str, int]]:
+    # LangChain's normalized usage first, then the raw payload in response_metadata
+    usage = getattr(msg, "usage_metadata", None)
+    if usage:
+        details = usage.get("output_token_details") or {}
+        return {
+            "input": usage.get("input_tokens", 0),
+            "output": usage.get("output_tokens", 0),
+            "reasoning": details.get("reasoning", 0),
+        }
+
+    meta = getattr(msg, "response_metadata", None) or {}
+    raw = meta.get("usage") or meta.get("token_usage")
+    if not raw:
+        return None
+    details = raw.get("output_tokens_details") or raw.get("completion_tokens_details") or {}
+    return {
+        "input": raw.get("input_tokens", raw.get("prompt_tokens", 0)) or 0,
+        "output": raw.get("output_tokens", raw.get("completion_tokens", 0)) or 0,
+        "reasoning": details.get("reasoning_tokens", 0) or 0,
+    }
+
+
+def record_llm_usage(model: str, msg: Any) -> None:
+    """Count the tokens an LLM reply (or stream chunk) reports, if it reports any."""
+    usage = _usage_of(msg)
+    if not usage:
+        return
+    for kind, n in usage.items():
+        if n:
+            LLM_TOKENS.labels(model, kind).inc(n)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering, unlike
+    BaseHTTPMiddleware). Requests are labeled by route template, so
+    /board/new/0.5 and /board/new/0.3 share a series.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_SECONDS.labels(method, path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
@@ -0,0 +1,386 @@
+# backend/services/nxn.py
+"""
+Sudoku on N×N grids with box_rows × box_cols boxes (4×4, 6×6, 9×9, 12×12,
+16×16, 25×25). The 9×9 fast paths in solver.py and generator.py stay as they
+are; this module covers every shape with the same bitmask approach.
+
+Boards are strings of N² characters, one per cell: '0' or '.' for empty, then
+1-9 and A-P for values 10-25, so a 9×9 board reads exactly as before.
+"""
+
+# imports
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+from math import isqrt
+from typing import Dict, List, Optional, Tuple
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+EMPTY_CHARS = "0."
+
+# supported sizes and their (box_rows, box_cols)
+SHAPES: Dict[int, Tuple[int, int]] = {
+    4: (2, 2),
+    6: (2, 3),
+    9: (3, 3),
+    12: (3, 4),
+    16: (4, 4),
+    25: (5, 5),
+}
+
+# value of each accepted character (lower case letters too)
+_CHAR_VALUE = {ch: i + 1 for i, ch in enumerate(SYMBOLS)}
+_CHAR_VALUE.update({ch.lower(): v for ch, v in _CHAR_VALUE.items() if ch.isalpha()})
+_CHAR_VALUE.update({ch: 0 for ch in EMPTY_CHARS})
+
+
+# board geometry and the lookup tables the solver indexes into
+@dataclass(frozen=True)
+class Shape:
+    size: int
+    box_rows: int
+    box_cols: int
+    units: List[List[int]] = field(init=False, repr=False, compare=False)
+    peers: List[List[int]] = field(init=False, repr=False, compare=False)
+    # line/box intersections, grouped so that a digit confined to one segment
+    # of a group can be removed from that segment's `rest` (locked candidates)
+    segments: List[List[Tuple[List[int], List[int]]]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        n, br, bc = self.size, self.box_rows, self.box_cols
+        if br * bc != n:
+            raise ValueError(f"{br}x{bc} boxes do not tile a {n}x{n} grid.")
+
+        units = (
+            [[r * n + c for c in range(n)] for r in range(n)]
+            + [[r * n + c for r in range(n)] for c in range(n)]
+            + [
+                [(r0 + r) * n + c0 + c for r in range(br) for c in range(bc)]
+                for r0 in range(0, n, br)
+                for c0 in range(0, n, bc)
+            ]
+        )
+        cell_units: List[List[int]] = [[] for _ in range(n * n)]
+        for u, cells in enumerate(units):
+            for i in cells:
+                cell_units[i].append(u)
+        peers = [
+            sorted({j for u in cell_units[i] for j in units[u]} - {i}) for i in range(n * n)
+        ]
+
+        boxes = units[2 * n:]
+        lines = units[:2 * n]
+        pointing: Dict[Tuple[int, bool], List[Tuple[List[int], List[int]]]] = {}
+        claiming: List[List[Tuple[List[int], List[int]]]] = []
+        for li, line in enumerate(lines):
+            groups = []
+            for bi, box in enumerate(boxes):
+                seg = [i for i in line if i in box]
+                if seg:
+                    groups.append((seg, [i for i in box if i not in seg]))
+                    pointing.setdefault((bi, li < n), []).append(
+                        (seg, [i for i in line if i not in seg])
+                    )
+            claiming.append(groups)
+
+        # frozen: set the derived tables directly
+        object.__setattr__(self, "units", units)
+        object.__setattr__(self, "peers", peers)
+        object.__setattr__(self, "segments", list(pointing.values()) + claiming)
+
+    @property
+    def cells(self) -> int:
+        return self.size * self.size
+
+    @property
+    def all_mask(self) -> int:
+        return (1 << self.size) - 1
+
+
+@lru_cache(maxsize=None)
+def get_shape(size: int, box_rows: Optional[int] = None, box_cols: Optional[int] = None) -> Shape:
+    if box_rows is None or box_cols is None:
+        if size not in SHAPES:
+            raise ValueError(f"Unsupported board size {size}; expected one of {sorted(SHAPES)}.")
+        box_rows, box_cols = SHAPES[size]
+    return Shape(size, box_rows, box_cols)
+
+
+# shape of a board string, from its length
+def shape_of(board: str) -> Shape:
+    size = isqrt(len(board))
+    if size * size != len(board) or size not in SHAPES:
+        raise ValueError(
+            f"Board string length {len(board)} does not match a supported size "
+            f"({', '.join(f'{n * n} for {n}x{n}' for n in SHAPES)})."
+        )
+    return get_shape(size)
+
+
+def parse_board(board: str, shape: Optional[Shape] = None) -> List[int]:
+    shape = shape or shape_of(board)
+    if len(board) != shape.cells:
+        raise ValueError(f"Board string must be exactly {shape.cells} characters.")
+
+    grid = []
+    for ch in board:
+        v = _CHAR_VALUE.get(ch)
+        if v is None or v > shape.size:
+            raise ValueError(f"Invalid character {ch!r} in a {shape.size}x{shape.size} board string.")
+        grid.append(v)
+    return grid
+
+
+def grid_to_str(grid: List[int]) -> str:
+    return "".join(SYMBOLS[v - 1] if v else "0" for v in grid)
+
+
+# ---------------------------------------------------------------------------
+# solver: candidate bitmasks, singles and locked candidates, then MRV branching
+# ---------------------------------------------------------------------------
+
+def _assign(shape: Shape, cands: List[int], cell: int, bit: int, queue: List[int]) -> bool:
+    cands[cell] = bit
+    for p in shape.peers[cell]:
+        m = cands[p]
+        if m & bit:
+            m &= ~bit
+            if not m:
+                return False
+            cands[p] = m
+            if not m & (m - 1):
+                queue.append(p)
+    return True
+
+
+# remove `mask` from the open cells in `cells`; None on a contradiction, else whether anything changed
+def _eliminate(cands: List[int], solved: List[bool], cells: List[int], mask: int, queue: List[int]) -> Optional[bool]:
+    changed = False
+    for i in cells:
+        m = cands[i]
+        if not solved[i] and m & mask:
+            m &= ~mask
+            if not m:
+                return None
+            cands[i] = m
+            changed = True
+            if not m & (m - 1):
+                queue.append(i)
+    return changed
+
+
+def _locked_candidates(shape: Shape, cands: List[int], solved: List[bool], queue: List[int]) -> Optional[bool]:
+    changed = False
+    for group in shape.segments:
+        once = twice = 0
+        masks = []
+        for seg, _ in group:
+            m = 0
+            for i in seg:
+                m |= cands[i]
+            masks.append(m)
+            twice |= once & m
+            once |= m
+        confined = once & ~twice
+        if not confined:
+            continue
+        for (_, rest), m in zip(group, masks):
+            if m & confined:
+                result = _eliminate(cands, solved, rest, m & confined, queue)
+                if result is None:
+                    return None
+                changed |= result
+    return changed
+
+
+# propagate until stuck; `solved` marks cells whose value is final
+def _propagate(shape: Shape, cands: List[int], solved: List[bool], queue: List[int]) -> bool:
+    while True:
+        while queue:
+            cell = queue.pop()
+            if solved[cell]:
+                continue
+            solved[cell] = True
+            if not _assign(shape, cands, cell, cands[cell], queue):
+                return False
+
+        # hidden singles: a digit with exactly one open cell in a unit
+        for unit in shape.units:
+            once = twice = placed = 0
+            for i in unit:
+                m = cands[i]
+                if solved[i]:
+                    placed |= m
+                else:
+                    twice |= once & m
+                    once |= m
+            if (once | placed) != shape.all_mask:
+                return False  # some digit has nowhere to go
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if not solved[i] and cands[i] & bit:
+                        cands[i] = bit
+                        queue.append(i)
+                        break
+        if queue:
+            continue
+
+        # the large grids rarely branch once pointing/claiming is applied
+        changed = _locked_candidates(shape, cands, solved, queue)
+        if changed is None:
+            return False
+        if not changed:
+            return True
+
+
+def _initial_state(shape: Shape, grid: List[int]) -> Optional[Tuple[List[int], List[bool], List[int]]]:
+    cands = [shape.all_mask] * shape.cells
+    solved = [False] * shape.cells
+    queue: List[int] = []
+    for i, v in enumerate(grid):
+        if v:
+            bit = 1 << (v - 1)
+            if not cands[i] & bit:
+                return None  # a given clashes with a peer
+            solved[i] = True
+            if not _assign(shape, cands, i, bit, queue):
+                return None
+    return cands, solved, queue
+
+
+def solve_grid(grid: List[int], shape: Shape, limit: int = 2) -> Tuple[Optional[List[int]], int]:
+    """
+    Solve a parsed grid, stopping after `limit` solutions.
+    Returns (first solution or None, number found).
+    """
+    state = _initial_state(shape, grid)
+    if state is None:
+        return None, 0
+
+    first: Optional[List[int]] = None
+    found = 0
+    stack = [state]
+    while stack:
+        cands, solved, queue = stack.pop()
+        if not _propagate(shape, cands, solved, queue):
+            continue
+
+        # open cell with the fewest candidates
+        best, best_count = -1, shape.size + 1
+        for i in range(shape.cells):
+            if not solved[i]:
+                count = bin(cands[i]).count("1")
+                if count < best_count:
+                    best, best_count = i, count
+                    if count == 2:
+                        break
+
+        if best < 0:
+            found += 1
+            if first is None:
+                first = [m.bit_length() for m in cands]
+            if found >= limit:
+                break
+            continue
+
+        m = cands[best]
+        while m:
+            bit = m & -m
+            m ^= bit
+            branch = cands[:]
+            branch[best] = bit
+            stack.append((branch, solved[:], [best]))
+
+    return first, found
+
+
+def solve(board: str, limit: int = 2, shape: Optional[Shape] = None) -> Tuple[Optional[str], int]:
+    """Solve a board string of any supported size; see solve_grid."""
+    shape = shape or shape_of(board)
+    solution, count = solve_grid(parse_board(board, shape), shape, limit)
+    return (grid_to_str(solution) if solution else None), count
+
+
+def has_unique_solution(board: str, shape: Optional[Shape] = None) -> bool:
+    return solve(board, limit=2, shape=shape)[1] == 1
+
+
+# ---------------------------------------------------------------------------
+# generator
+# ---------------------------------------------------------------------------
+
+def random_solution(shape: Shape, rng: random.Random) -> List[int]:
+    """
+    Random complete grid: a valid base pattern shuffled by the symmetries
+    that keep it valid (digits, rows within bands, bands, columns within
+    stacks, stacks). Unlike solving from an empty grid this is instant at 25x25.
+    """
+    n, br, bc = shape.size, shape.box_rows, shape.box_cols
+
+    def shuffled(groups: int, per: int) -> List[int]:
+        order = rng.sample(range(groups), groups)
+        return [g * per + i for g in order for i in rng.sample(range(per), per)]
+
+    rows = shuffled(n // br, br)
+    cols = shuffled(n // bc, bc)
+    digits = rng.sample(range(1, n + 1), n)
+    return [
+        digits[(bc * (r % br) + r // br + c) % n]
+        for r in rows
+        for c in cols
+    ]
+
+
+# can propagation alone finish the grid? Such a puzzle has exactly one solution
+def _logic_solves(grid: List[int], shape: Shape) -> bool:
+    state = _initial_state(shape, grid)
+    if state is None:
+        return False
+    cands, solved, queue = state
+    return _propagate(shape, cands, solved, queue) and all(solved)
+
+
+# does what's left of `cell`'s peers pin it to a single digit?
+def _forced(grid: List[int], shape: Shape, cell: int) -> bool:
+    used = 0
+    for p in shape.peers[cell]:
+        if grid[p]:
+            used |= 1 << (grid[p] - 1)
+    return bin(used).count("1") == shape.size - 1
+
+
+def generate_puzzle(
+    difficulty: float,
+    shape: Shape,
+    rng: Optional[random.Random] = None,
+) -> Tuple[str, str]:
+    """
+    Puzzle with exactly one solution and up to `difficulty` * N² empty cells;
+    returns (board, solution). A given is only removed while singles and
+    locked candidates still finish the grid, which proves uniqueness without
+    searching (a search-based check takes minutes at 25x25). The puzzle is not
+    technique-rated: the logic ladder in logic.py is 9x9 only.
+    """
+    rng = rng or random.Random()
+    solution = random_solution(shape, rng)
+    target_empties = round(difficulty * shape.cells)
+
+    grid = solution[:]
+    order = list(range(shape.cells))
+    rng.shuffle(order)
+
+    empties = 0
+    for cell in order:
+        if empties >= target_empties:
+            break
+        digit = grid[cell]
+        grid[cell] = 0
+        if _forced(grid, shape, cell) or _logic_solves(grid, shape):
+            empties += 1
+        else:
+            grid[cell] = digit
+
+    return grid_to_str(grid), grid_to_str(solution)
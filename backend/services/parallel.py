@@ -0,0 +1,49 @@
+# backend/services/parallel.py
+
+# imports
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# items per worker task, and tasks in flight per worker
+CHUNK_SIZE = 256
+IN_FLIGHT_PER_WORKER = 2
+
+
+# spawn, not fork: the app process may hold threads and open SQLite handles
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def bounded_map(
+    fn: Callable[[List[T]], List[R]],
+    items: Iterable[T],
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[R]:
+    """
+    Run `fn` over chunks of `items` in a process pool, yielding results in
+    order. Unlike Executor.map, which submits the whole input up front, only a
+    few chunks per worker are in flight at once. `fn` must be picklable (a
+    module-level function or a functools.partial of one).
+    """
+    workers = workers or os.cpu_count() or 1
+    items = iter(items)
+    in_flight: Deque[Future] = deque()
+    with spawn_pool(workers) as ex:
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < IN_FLIGHT_PER_WORKER * workers:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                in_flight.append(ex.submit(fn, chunk))
+            if in_flight:
+                yield from in_flight.popleft().result()
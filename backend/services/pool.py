@@ -0,0 +1,134 @@
+# backend/services/pool.py
+
+# imports
+import os
+import random
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Optional
+
+# local imports
+from backend.services.board import generate_board
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+# difficulties the frontend asks for (see strengthMap in board.js)
+POOL_BUCKETS = [
+    float(b) for b in os.getenv("PUZZLE_POOL_BUCKETS", "0.1,0.25,0.5,0.75").split(",") if b.strip()
+]
+POOL_LOW_WATERMARK = int(os.getenv("PUZZLE_POOL_LOW", "5"))
+POOL_HIGH_WATERMARK = int(os.getenv("PUZZLE_POOL_HIGH", "20"))
+POOL_WORKERS = int(os.getenv("PUZZLE_POOL_WORKERS", "2"))
+# requests within this distance of a bucket are served from it
+POOL_TOLERANCE = float(os.getenv("PUZZLE_POOL_TOLERANCE", "0.05"))
+
+
+# keeps a queue of ready puzzles per difficulty bucket, refilled off the event loop
+class PuzzlePool:
+    def __init__(
+        self,
+        buckets: Iterable[float],
+        low: int = POOL_LOW_WATERMARK,
+        high: int = POOL_HIGH_WATERMARK,
+        workers: int = POOL_WORKERS,
+        tolerance: float = POOL_TOLERANCE,
+    ) -> None:
+        if low < 0 or high < low:
+            raise ValueError(f"Invalid pool watermarks low={low}, high={high}.")
+
+        self.low = low
+        self.high = high
+        self.workers = workers
+        self.tolerance = tolerance
+        self._pools: Dict[float, Deque[str]] = {float(b): deque() for b in buckets}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # nearest bucket to `difficulty`, if one is within the tolerance
+    def bucket_for(self, difficulty: float) -> Optional[float]:
+        if not self._pools:
+            return None
+        bucket = min(self._pools, key=lambda b: abs(b - difficulty))
+        return bucket if abs(bucket - difficulty) <= self.tolerance + 1e-9 else None
+
+    def size(self, difficulty: float) -> int:
+        bucket = self.bucket_for(difficulty)
+        return len(self._pools[bucket]) if bucket is not None else 0
+
+    # O(1) pop; returns None when the bucket is unknown or empty
+    def pop(self, difficulty: float) -> Optional[str]:
+        bucket = self.bucket_for(difficulty)
+        if bucket is None:
+            return None
+
+        pool = self._pools[bucket]
+        board = pool.popleft() if pool else None
+
+        if len(pool) < self.low and self._wakeup is not None:
+            self._wakeup.set()
+
+        return board
+
+    async def start(self) -> None:
+        if self._task is not None or self.workers <= 0:
+            return
+
+        # spawn + reseed so every worker draws its own random boards
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=random.seed,
+        )
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop())
+        logger.info("Puzzle pool started for buckets %s", sorted(self._pools))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        self._wakeup = None
+
+    async def _refill_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            await self._fill()
+            await self._wakeup.wait()
+
+    # top every bucket back up to the high watermark, hardest first
+    async def _fill(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        for bucket in sorted(self._pools, reverse=True):
+            pool = self._pools[bucket]
+            need = self.high - len(pool)
+            if need <= 0:
+                continue
+
+            jobs = [
+                loop.run_in_executor(self._executor, generate_board, bucket)
+                for _ in range(need)
+            ]
+            for job in asyncio.as_completed(jobs):
+                try:
+                    pool.append(await job)
+                except Exception:
+                    logger.exception("Background puzzle generation failed for difficulty %s.", bucket)
+
+            logger.debug("Refilled puzzle pool bucket %s to %d", bucket, len(pool))
+
+
+puzzle_pool = PuzzlePool(POOL_BUCKETS)
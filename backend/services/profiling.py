@@ -0,0 +1,299 @@
+# backend/services/profiling.py
+"""
+Opt-in request profiler for the live service and the eval runner.
+
+A sampled fraction of `with profiler.profile(name):` blocks is profiled,
+everything else pays one random() call. Two modes:
+
+- "stack" (default): a sampler thread records the stack of the thread that
+  entered the block (the event loop for handlers) every `interval_ms`, plus
+  busy default-executor threads (asyncio.to_thread work). Stacks are
+  aggregated per name into flamegraph-ready collapsed files:
+  <PROFILE_DIR>/<name>.collapsed, one "frame;frame;frame count" per line
+  (flamegraph.pl, speedscope, inferno).
+- "cprofile": cProfile around the block, accumulated per name into
+  <PROFILE_DIR>/<name>.prof (pstats/snakeviz). Only one block is profiled at
+  a time, since the interpreter allows a single active profiler.
+
+Either way, tasks interleaved on the same event loop while a sampled block is
+awaiting show up in its profile; at low sample rates that is rare noise.
+
+Switch on with PROFILE_SAMPLE_RATE (0..1) or at runtime via /admin/profiling.
+"""
+
+# imports
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# local imports
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "stack")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_FLUSH_SECONDS = float(os.getenv("PROFILE_FLUSH_SECONDS", "30"))
+
+MODES = ("stack", "cprofile")
+
+# deepest stack kept per sample (outermost frames are dropped beyond this)
+MAX_DEPTH = 128
+
+_ROOT = str(Path(__file__).resolve().parents[2])
+
+# leaf frames of a thread that is only waiting; these samples are dropped
+_IDLE = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    # no spaces or semicolons: they delimit the collapsed format
+    return f"{path}:{code.co_name}".replace(" ", "_").replace(";", ":")
+
+
+def _collapse(frame, root: str) -> Optional[str]:
+    leaf = frame.f_code
+    if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE:
+        return None
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+@dataclass
+class ProfilerConfig:
+    sample_rate: float = PROFILE_SAMPLE_RATE
+    mode: str = PROFILE_MODE
+    interval_ms: float = PROFILE_INTERVAL_MS
+    out_dir: str = PROFILE_DIR
+
+
+class Profiler:
+    def __init__(self, cfg: Optional[ProfilerConfig] = None) -> None:
+        self.cfg = cfg or ProfilerConfig()
+        self._lock = threading.Lock()
+        self._active: Dict[int, List[str]] = {}     # thread id -> names of sampled blocks on it
+        self._stacks: Dict[str, Counter] = {}       # name -> collapsed stack -> samples
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._cprofile_busy = False
+        self._sampler: Optional[threading.Thread] = None
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.sampled = Counter()                    # name -> blocks profiled
+
+    @property
+    def enabled(self) -> bool:
+        return self.cfg.sample_rate > 0
+
+    def configure(
+        self,
+        sample_rate: Optional[float] = None,
+        mode: Optional[str] = None,
+        interval_ms: Optional[float] = None,
+    ) -> None:
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; use one of {MODES}.")
+        if sample_rate is not None and not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        if interval_ms is not None and interval_ms <= 0:
+            raise ValueError("interval_ms must be positive.")
+
+        with self._lock:
+            if sample_rate is not None:
+                self.cfg.sample_rate = sample_rate
+            if mode is not None:
+                self.cfg.mode = mode
+            if interval_ms is not None:
+                self.cfg.interval_ms = interval_ms
+        logger.info(
+            "Profiling: rate %s, mode %s, every %sms",
+            self.cfg.sample_rate, self.cfg.mode, self.cfg.interval_ms,
+        )
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile this block if it is sampled; costs one random() call otherwise."""
+        rate = self.cfg.sample_rate
+        if rate <= 0 or random.random() >= rate:
+            yield
+            return
+
+        if self.cfg.mode == "cprofile":
+            with self._cprofile(name):
+                yield
+            return
+
+        tid = threading.get_ident()
+        with self._lock:
+            self._active.setdefault(tid, []).append(name)
+            self.sampled[name] += 1
+        self._ensure_sampler()
+        try:
+            yield
+        finally:
+            with self._lock:
+                names = self._active[tid]
+                names.remove(name)
+                if not names:
+                    del self._active[tid]
+
+    @contextmanager
+    def _cprofile(self, name: str) -> Iterator[None]:
+        with self._lock:
+            if self._cprofile_busy:
+                busy = True
+            else:
+                busy, self._cprofile_busy = False, True
+                prof = self._profiles.setdefault(name, cProfile.Profile())
+                self.sampled[name] += 1
+        if busy:
+            yield
+            return
+
+        try:
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+        finally:
+            with self._lock:
+                self._cprofile_busy = False
+                self._dirty = True
+        self._maybe_flush()
+
+    # ---- stack sampler -----------------------------------------------------
+
+    def _ensure_sampler(self) -> None:
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive():
+                return
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.cfg.interval_ms / 1000)
+            with self._lock:
+                active = {tid: names[0] for tid, names in self._active.items()}
+            if active:
+                self._take_sample(active, me)
+            self._maybe_flush()
+
+            # stop when nothing has been sampled for a while; the next block restarts it
+            if not active and not self.enabled:
+                return
+
+    def _take_sample(self, active: Dict[int, str], me: int) -> None:
+        frames = sys._current_frames()
+        executor = {
+            t.ident for t in threading.enumerate()
+            if t.name.startswith("asyncio_") and t.ident != me
+        }
+        # a sampled block's name is charged for its own thread and for any
+        # executor thread working on its behalf (attribution is approximate)
+        name = next(iter(active.values()))
+        samples: List[Tuple[str, str]] = []
+        for tid, block in active.items():
+            frame = frames.get(tid)
+            if frame is not None:
+                stack = _collapse(frame, block)
+                if stack:
+                    samples.append((block, stack))
+        for tid in executor:
+            frame = frames.get(tid)
+            if frame is not None:
+                stack = _collapse(frame, f"{name};[executor]")
+                if stack:
+                    samples.append((name, stack))
+
+        if samples:
+            with self._lock:
+                for block, stack in samples:
+                    self._stacks.setdefault(block, Counter())[stack] += 1
+                self._dirty = True
+
+    # ---- output ------------------------------------------------------------
+
+    def _maybe_flush(self) -> None:
+        if self._dirty and time.monotonic() - self._last_flush >= PROFILE_FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self) -> List[Path]:
+        """Write the aggregated profiles so far; returns the files written."""
+        with self._lock:
+            stacks = {name: dict(c) for name, c in self._stacks.items()}
+            # a Profile can't be dumped while it is collecting; the next flush gets it
+            profiles = dict(self._profiles) if not self._cprofile_busy else {}
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        out = Path(self.cfg.out_dir)
+        written: List[Path] = []
+        if not stacks and not profiles:
+            return written
+        out.mkdir(parents=True, exist_ok=True)
+
+        for name, counts in stacks.items():
+            path = out / f"{name}.collapsed"
+            tmp = path.with_name(path.name + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                for stack, n in sorted(counts.items()):
+                    f.write(f"{stack} {n}\n")
+            os.replace(tmp, path)
+            written.append(path)
+
+        for name, prof in profiles.items():
+            path = out / f"{name}.prof"
+            prof.dump_stats(str(path))
+            written.append(path)
+
+        return written
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.sampled.clear()
+            if not self._cprofile_busy:
+                self._profiles.clear()
+
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "sample_rate": self.cfg.sample_rate,
+                "mode": self.cfg.mode,
+                "interval_ms": self.cfg.interval_ms,
+                "out_dir": str(Path(self.cfg.out_dir).resolve()),
+                "sampled": dict(self.sampled),
+                "stack_samples": {name: sum(c.values()) for name, c in self._stacks.items()},
+            }
+
+
+profiler = Profiler()
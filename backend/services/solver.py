@@ -0,0 +1,353 @@
+# backend/services/solver.py
+
+# imports
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# board geometry for a 9×9 Sudoku
+SIZE = 9
+CELLS = SIZE * SIZE
+ALL_DIGITS = (1 << SIZE) - 1  # bit d-1 set => digit d is a candidate
+
+# precomputed lookup tables so the hot loop is just list indexing
+ROW_OF = [i // SIZE for i in range(CELLS)]
+COL_OF = [i % SIZE for i in range(CELLS)]
+BOX_OF = [(i // SIZE // 3) * 3 + (i % SIZE) // 3 for i in range(CELLS)]
+
+UNITS: List[List[int]] = (
+    [[r * SIZE + c for c in range(SIZE)] for r in range(SIZE)]
+    + [[r * SIZE + c for r in range(SIZE)] for c in range(SIZE)]
+    + [
+        [(br + r) * SIZE + bc + c for r in range(3) for c in range(3)]
+        for br in range(0, SIZE, 3)
+        for bc in range(0, SIZE, 3)
+    ]
+)
+
+# indices of the row/col/box units each cell belongs to
+CELL_UNITS = [(ROW_OF[i], SIZE + COL_OF[i], 2 * SIZE + BOX_OF[i]) for i in range(CELLS)]
+PEERS: List[List[int]] = [
+    sorted({j for u in CELL_UNITS[i] for j in UNITS[u]} - {i}) for i in range(CELLS)
+]
+
+# (kind, index) per unit, kind 0/1/2 = row/col/box
+UNIT_KIND = [(k, j) for k in range(3) for j in range(SIZE)]
+
+POPCOUNT = [bin(m).count("1") for m in range(ALL_DIGITS + 1)]
+BIT_TO_DIGIT = {1 << d: d + 1 for d in range(SIZE)}
+
+# characters accepted for an empty cell
+EMPTY_CHARS = "0."
+
+
+# parse an 81-char board string into a list of ints (0 = empty)
+def parse_board(board_str: str) -> List[int]:
+    if len(board_str) != CELLS:
+        raise ValueError(f"Board string must be exactly {CELLS} characters.")
+
+    grid = []
+    for ch in board_str:
+        if ch in EMPTY_CHARS:
+            grid.append(0)
+        elif "1" <= ch <= "9":
+            grid.append(ord(ch) - 48)
+        else:
+            raise ValueError(f"Invalid character {ch!r} in board string.")
+    return grid
+
+
+def grid_to_str(grid: List[int]) -> str:
+    return "".join(map(str, grid))
+
+
+# build row/col/box masks; returns None when two givens clash
+def _build_masks(grid: List[int]) -> Optional[Tuple[List[int], List[int], List[int]]]:
+    rows = [0] * SIZE
+    cols = [0] * SIZE
+    boxes = [0] * SIZE
+
+    for i, v in enumerate(grid):
+        if not v:
+            continue
+        bit = 1 << (v - 1)
+        r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+        if (rows[r] | cols[c] | boxes[b]) & bit:
+            return None
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+
+    return rows, cols, boxes
+
+
+# depth-first search with naked/hidden single propagation and MRV branching
+def _search(
+    grid: List[int],
+    rows: List[int],
+    cols: List[int],
+    boxes: List[int],
+    empties: List[int],
+    limit: int,
+    found: List[List[int]],
+) -> int:
+    # local aliases keep global lookups out of the inner loops
+    row_of, col_of, box_of = ROW_OF, COL_OF, BOX_OF
+    popcount, bit_to_digit = POPCOUNT, BIT_TO_DIGIT
+    cand = [0] * CELLS
+    masks = (rows, cols, boxes)
+
+    while True:
+        best = -1
+        best_count = SIZE + 1
+        placed = False
+        remaining = []
+
+        # naked singles (and the MRV cell for branching)
+        for i in empties:
+            r, c, b = row_of[i], col_of[i], box_of[i]
+            m = ALL_DIGITS & ~(rows[r] | cols[c] | boxes[b])
+            if not m:
+                return 0
+
+            if not m & (m - 1):
+                grid[i] = bit_to_digit[m]
+                rows[r] |= m
+                cols[c] |= m
+                boxes[b] |= m
+                cand[i] = 0
+                placed = True
+                continue
+
+            cand[i] = m
+            remaining.append(i)
+            n = popcount[m]
+            if n < best_count:
+                best_count = n
+                best = i
+
+        empties = remaining
+        if placed:
+            continue
+
+        if not empties:
+            if not found:
+                found.append(grid[:])
+            return 1
+
+        # hidden singles: a digit with exactly one home in a unit
+        for u, unit in enumerate(UNITS):
+            once = twice = 0
+            for i in unit:
+                m = cand[i]
+                twice |= once & m
+                once |= m
+
+            kind, j = UNIT_KIND[u]
+            solved = masks[kind][j]
+
+            # some digit has nowhere left to go in this unit
+            if (once | solved) != ALL_DIGITS:
+                return 0
+
+            hidden = once & ~twice & ~solved
+            if not hidden:
+                continue
+
+            for i in unit:
+                m = cand[i] & hidden
+                if not m:
+                    continue
+                if m & (m - 1):
+                    return 0  # one cell forced to hold two digits
+
+                r, c, b = row_of[i], col_of[i], box_of[i]
+                if (rows[r] | cols[c] | boxes[b]) & m:
+                    return 0
+                grid[i] = bit_to_digit[m]
+                rows[r] |= m
+                cols[c] |= m
+                boxes[b] |= m
+                cand[i] = 0
+                placed = True
+
+        if placed:
+            empties = [i for i in empties if not grid[i]]
+            continue
+
+        # branch on the cell with the fewest candidates
+        total = 0
+        m = cand[best]
+        r, c, b = row_of[best], col_of[best], box_of[best]
+        rest = [i for i in empties if i != best]
+        while m:
+            bit = m & -m
+            m ^= bit
+
+            g = grid[:]
+            g[best] = bit_to_digit[bit]
+            rs, cs, bs = rows[:], cols[:], boxes[:]
+            rs[r] |= bit
+            cs[c] |= bit
+            bs[b] |= bit
+
+            total += _search(g, rs, cs, bs, rest, limit - total, found)
+            if total >= limit:
+                break
+
+        return total
+
+
+def solve_grid(grid: List[int], limit: int = 2) -> Tuple[Optional[List[int]], int]:
+    """
+    Solve a parsed grid. Returns (first solution or None, solution count),
+    where the count stops at `limit` (so 2 means "more than one").
+    """
+    masks = _build_masks(grid)
+    if masks is None:
+        return None, 0
+
+    empties = [i for i, v in enumerate(grid) if not v]
+    found: List[List[int]] = []
+    count = _search(grid[:], *masks, empties, limit, found)
+    return (found[0] if found else None), count
+
+
+def solve(board_str: str, limit: int = 2) -> Tuple[Optional[str], int]:
+    """
+    Solve an 81-char board string. Returns (solution or None, solution count)
+    with the count capped at `limit`. Raises ValueError on malformed input.
+    """
+    solution, count = solve_grid(parse_board(board_str), limit)
+    return (grid_to_str(solution) if solution else None), count
+
+
+def count_solutions(board_str: str, limit: int = 2) -> int:
+    return solve(board_str, limit)[1]
+
+
+def has_unique_solution(board_str: str) -> bool:
+    return count_solutions(board_str, 2) == 1
+
+
+# numpy versions of the lookup tables for the batch kernel
+_UNITS_NP = np.array(UNITS, dtype=np.intp)                          # (27, 9)
+_ROW_NP = np.array(ROW_OF, dtype=np.intp)
+_COL_NP = np.array(COL_OF, dtype=np.intp)
+_BOX_NP = np.array(BOX_OF, dtype=np.intp)
+_POPCOUNT_NP = np.array(POPCOUNT, dtype=np.uint8)
+_SINGLE_DIGIT_NP = np.zeros(ALL_DIGITS + 1, dtype=np.int8)        # mask -> digit if one bit
+for _bit, _digit in BIT_TO_DIGIT.items():
+    _SINGLE_DIGIT_NP[_bit] = _digit
+_DIGIT_BITS_NP = np.array([0] + [1 << d for d in range(SIZE)], dtype=np.uint16)
+
+# byte value -> digit for board strings ('0' and '.' are empty, -1 is invalid)
+_BYTE_TO_DIGIT = np.full(256, -1, dtype=np.int8)
+_BYTE_TO_DIGIT[ord("0")] = 0
+_BYTE_TO_DIGIT[ord(".")] = 0
+for _d in range(1, SIZE + 1):
+    _BYTE_TO_DIGIT[ord(str(_d))] = _d
+_DIGIT_TO_BYTE = bytes(48 + d if d <= SIZE else 0 for d in range(256))
+
+
+def parse_boards(boards: Sequence[str]) -> np.ndarray:
+    """Encode board strings as an (N, 81) int8 array (0 = empty)."""
+    if any(len(b) != CELLS for b in boards):
+        raise ValueError(f"Board strings must be exactly {CELLS} characters.")
+
+    raw = np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8)
+    grids = _BYTE_TO_DIGIT[raw].reshape(len(boards), CELLS)
+    if (grids < 0).any():
+        raise ValueError("Invalid character in board string.")
+    return grids
+
+
+def _unit_masks(grids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # OR of placed digit bits per unit, plus a flag for units holding a digit twice
+    bits = _DIGIT_BITS_NP[grids][:, _UNITS_NP]                       # (N, 27, 9)
+    masks = np.bitwise_or.reduce(bits, axis=2)
+    filled = (bits != 0).sum(axis=2, dtype=np.uint8)
+    return masks, filled > _POPCOUNT_NP[masks]
+
+
+def propagate_batch(grids: np.ndarray, max_rounds: int = CELLS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply naked and hidden singles to every board in an (N, 81) batch at once.
+    Returns (grids, dead) where `dead` flags boards that hit a contradiction.
+    Boards left with zeros need a scalar search to finish.
+    """
+    grids = grids.copy()
+    _, dead = _unit_masks(grids)
+    dead = dead.any(axis=1)
+    active = ~dead & (grids == 0).any(axis=1)
+
+    for _ in range(max_rounds):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+
+        g = grids[idx]
+        units, _ = _unit_masks(g)
+        used = units[:, _ROW_NP] | units[:, SIZE + _COL_NP] | units[:, 2 * SIZE + _BOX_NP]
+        empty = g == 0
+        cand = np.where(empty, ALL_DIGITS & ~used, 0).astype(np.uint16)
+
+        # naked singles
+        new = np.where(empty, _SINGLE_DIGIT_NP[cand], 0).astype(np.int8)
+        stuck = (empty & (cand == 0)).any(axis=1)
+
+        # hidden singles via the once/twice trick, one cell position at a time
+        unit_cand = cand[:, _UNITS_NP]                                # (k, 27, 9)
+        once = np.zeros(units.shape, dtype=np.uint16)
+        twice = np.zeros(units.shape, dtype=np.uint16)
+        for p in range(SIZE):
+            m = unit_cand[:, :, p]
+            twice |= once & m
+            once |= m
+
+        # a digit with no home left in some unit
+        stuck |= ((once | units) != ALL_DIGITS).any(axis=1)
+
+        hidden = once & ~twice & ~units
+        for p in range(SIZE):
+            hit = unit_cand[:, :, p] & hidden
+            rows, us = np.nonzero(hit)
+            if rows.size == 0:
+                continue
+            digits = _SINGLE_DIGIT_NP[hit[rows, us]]
+            stuck[rows[digits == 0]] = True  # one cell forced to hold two digits
+            new[rows, _UNITS_NP[us, p]] = digits
+
+        g = np.where(new != 0, new, g)
+        grids[idx] = g
+
+        _, clashed = _unit_masks(g)
+        stuck |= clashed.any(axis=1)
+        dead[idx] |= stuck
+        active[idx] = ~stuck & (new != 0).any(axis=1) & (g == 0).any(axis=1)
+
+    return grids, dead
+
+
+def solve_batch(boards: Sequence[str]) -> List[Optional[str]]:
+    """
+    Solve many boards: vectorized propagation for the whole batch, then the
+    scalar search only for boards that propagation could not finish.
+    Returns one solution string per board, or None when unsolvable.
+    """
+    if not boards:
+        return []
+
+    grids, dead = propagate_batch(parse_boards(boards))
+    out: List[Optional[str]] = [None] * len(boards)
+
+    filled = ~dead & (grids != 0).all(axis=1)
+    for i in np.flatnonzero(filled):
+        out[i] = grids[i].tobytes().translate(_DIGIT_TO_BYTE).decode("ascii")
+
+    for i in np.flatnonzero(~dead & ~filled):
+        solution, _ = solve_grid(grids[i].tolist(), limit=1)
+        if solution:
+            out[i] = grid_to_str(solution)
+
+    return out
+
@@ -2,12 +2,29 @@
 
 # imports
 from pathlib import Path
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from typing import Optional
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from colorama import init as colorama_init, Fore, Style
 
 PROMPT_DIR = Path(__file__).parent / "prompts"
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "color")     # "color" or "json"
+# hand records to a background thread that formats and writes them
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"
+
+# set per request; attached to every record logged while handling it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
 colorama_init(autoreset=True) # initialize colorama for Windows
 
 class ColorFormatter(logging.Formatter):
@@ -34,32 +51,145 @@ def load_prompt(name: str) -> str:
     path = PROMPT_DIR / f"{name}"
     return path.read_text(encoding="utf-8")
 
+# LogRecord attributes; anything else on a record came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "session_id",
+}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request/session IDs and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "session_id"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+# stamps records with the current request/session; runs in the caller, before queueing
+class _ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+# arguments safe to interpolate later, on the listener thread
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread. The stock
+    prepare() formats in the caller; here only arguments that could change
+    before the listener gets to them (lists, models) are interpolated now.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE) for a in args):
+            return record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 # single shared handler for all loggers created via get_logger
-_stream_handler: Optional[logging.Handler] = None
+_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _make_stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else ColorFormatter())
+    return handler
+
+def _get_handler() -> logging.Handler:
+    global _handler, _listener
+    if _handler is None:
+        stream = _make_stream_handler()
+        if LOG_QUEUE:
+            q: queue.SimpleQueue = queue.SimpleQueue()
+            handler = _DeferredQueueHandler(q)
+            _listener = logging.handlers.QueueListener(q, stream)
+            _listener.start()
+            atexit.register(stop_logging)
+        else:
+            handler = stream
+        handler.addFilter(_ContextFilter())
+        _handler = handler
+    return _handler
 
-def _get_stream_handler() -> logging.Handler:
-    global _stream_handler
-    if _stream_handler is None:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(ColorFormatter())
-        _stream_handler = handler
-    return _stream_handler
+# runs at interpreter exit, after uvicorn has shut the app down
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread (safe to call twice)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
-# returns a logger with colored output
+# returns a logger with colored (or JSON) output
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
-    Get a logger with colored output.
+    Get a logger with colored output, or JSON lines with LOG_FORMAT=json.
     Call this from any module: logger = get_logger(__name__).
+    Pass arguments rather than f-strings (logger.debug("x: %s", x)) so
+    disabled levels cost nothing.
     """
     logger = logging.getLogger(name or "app")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(LOG_LEVEL)
 
     # Avoid adding multiple handlers if called many times
-    handler = _get_stream_handler()
+    handler = _get_handler()
     if handler not in logger.handlers:
         logger.addHandler(handler)
 
     # Let uvicorn/system also handle logs if needed
     logger.propagate = False
-    return logger
\ No newline at end of file
+    return logger
+
+
+class RequestContextMiddleware:
+    """
+    Plain ASGI middleware that gives each HTTP request an ID for its log
+    lines: the client's X-Request-ID if sent, else a fresh one. The ID is
+    echoed back in the response headers.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", ()):
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        request_token = request_id_var.set(request_id)
+        session_token = session_id_var.set(None)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_token)
+            session_id_var.reset(session_token)
@@ -1,13 +1,23 @@
-let ALL_ROWS = [];   // keep original copy
+const PAGE_SIZE = 200;
 
-async function loadSolveSteps() {
-    const rows = await fetch("/analytics/steps").then(r => r.json());
-    ALL_ROWS = rows;
-    renderRows(rows);
+let nextCursor = null;   // id to continue below, null when there are no more rows
+let sessionFilter = "";
+let searchTimer = null;
+
+async function loadSolveSteps(append = false) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (sessionFilter) params.set("session_id", sessionFilter);
+    if (append && nextCursor !== null) params.set("cursor", nextCursor);
+
+    const page = await fetch(`/analytics/steps?${params}`).then(r => r.json());
+    nextCursor = page.next_cursor;
+
+    renderRows(page.steps, append);
+    document.getElementById("load-more").style.display = nextCursor === null ? "none" : "";
 }
 
 // render function
-function renderRows(rows) {
+function renderRows(rows, append) {
     let html = "";
     rows.forEach(s => {
         html += `<tr>
@@ -23,23 +33,37 @@ function renderRows(rows) {
             <td>${s.created_at}</td>
         </tr>`;
     });
-    document.getElementById("steps-body").innerHTML = html;
+
+    const body = document.getElementById("steps-body");
+    if (append) {
+        body.insertAdjacentHTML("beforeend", html);
+    } else {
+        body.innerHTML = html;
+    }
 }
 
-// filter function
+// filter by session id on the server
 document.getElementById("search-input").addEventListener("input", function () {
-    const q = this.value.trim().toLowerCase();
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => {
+        sessionFilter = this.value.trim();
+        loadSolveSteps();
+    }, 250);
+});
 
-    if (!q) {
-        renderRows(ALL_ROWS);
-        return;
-    }
+document.getElementById("load-more").addEventListener("click", () => loadSolveSteps(true));
 
-    const filtered = ALL_ROWS.filter(s =>
-        String(s.session_id).toLowerCase().includes(q)
-    );
+async function loadSummaries() {
+    const [techniques, volume] = await Promise.all([
+        fetch("/analytics/summary/techniques").then(r => r.json()),
+        fetch("/analytics/summary/volume?granularity=day&limit=14").then(r => r.json()),
+    ]);
 
-    renderRows(filtered);
-});
+    document.getElementById("technique-summary").innerHTML =
+        techniques.map(t => `<li>${t.method_used}: ${t.hints}</li>`).join("");
+    document.getElementById("volume-summary").innerHTML =
+        volume.map(v => `<li>${v.period}: ${v.hints}</li>`).join("");
+}
 
-loadSolveSteps();
\ No newline at end of file
+loadSolveSteps();
+loadSummaries();
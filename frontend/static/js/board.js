@@ -425,7 +425,7 @@ document.querySelectorAll(".difficulty-btn").forEach(btn => {
       "easy":      0.25,
       "medium":    0.50,
       "hard":      0.75,
-      "expert":    0.90
+      "expert":    0.79   // the API's max; unique 9×9 puzzles have at least 17 givens
     };
 
     const strength = strengthMap[diff];
@@ -29,26 +29,69 @@ async function handleResponse() {
   const thinkingBubble = addThinkingBubble();
 
   try {
-    const res = await fetch("/ai/query", {
+    const res = await fetch("/ai/query/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(payload),
     });
 
-    const data = await res.json();
-    console.log("SERVER RESPONSE:", data);
+    if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+    // show tokens as they arrive; the hint event carries the move to highlight
+    let reply = "";
+    let hint = null;
+    await readEvents(res.body, (event, data) => {
+      if (event === "token") {
+        reply += data.text;
+        updateThinkingBubble(thinkingBubble, reply);
+      } else if (event === "hint") {
+        hint = data;
+      } else if (event === "done") {
+        reply = data.reply;
+      } else if (event === "error") {
+        throw new Error(data.detail);
+      }
+    });
+    console.log("SERVER RESPONSE:", reply, hint);
 
-    const reply = data.reply || "(no reply)";
+    reply = reply || "(no reply)";
     messages.push({ role: "assistant", content: reply });
 
     updateThinkingBubble(thinkingBubble, reply);
-    window.BoardUtils.highlightCell(data.r - 1, data.c - 1);  // convert to 0-based
+    if (hint) window.BoardUtils.highlightCell(hint.r - 1, hint.c - 1);  // convert to 0-based
   } catch (err) {
     console.error("ERROR:", err);
     updateThinkingBubble(thinkingBubble, "Error contacting server.");
   }
 }
 
+// reads a text/event-stream body and calls onEvent(event, data) per message
+async function readEvents(body, onEvent) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 // adds the user message to the chat window
 function addUserMessage(text) {
   const msg = document.createElement("div");
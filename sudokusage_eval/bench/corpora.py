@@ -0,0 +1,200 @@
+# sudokusage_eval/bench/corpora.py
+"""
+Fixed puzzle sets for the benchmark suite. They are frozen here rather than
+generated at run time, so a change to the generator cannot move the baseline.
+"""
+
+# single-technique boards, about 35% empty (generator, difficulty 0.35)
+EASY = [
+    "380506700200000580615809420900283641036197058100654030500708390792315864800942005",
+    "469071305152084079380059024201843750506007200708562903914735000025198007800406000",
+    "000500009587040601401207358920136087150472960673895014240080135009050742005004896",
+    "040032915107800060320010748783624001490180607015007284531070406904060850268403170",
+    "106832005283597100007006380071328459400160837098004201000941003004673008739205614",
+    "601830059059276180074159060240301076530608000100725408402563007983407020765902001",
+    "010026009749150206203078401050064197190732508087091603974605832520080064000049710",
+    "409003150328175040610400200030516084184739526060002931840057090790304805253901007",
+    "026590107407306050008274090800430619913607425060059783042860971609020534000905802",
+    "040361270700204638630098045809520410120003790374619852200400061010906507950170304",
+    "708000000931670024026834190693127548004598370807063010072986450480050760300741200",
+    "469000207270460000000009600593740016147685023680031704831027409754006132026014578",
+]
+
+# need pairs, triples or fish to solve by logic (generator, difficulty 0.72)
+HARD = [
+    "070000000504000008003094076000060019200000000780009043000010000300007900000005184",
+    "200300008100000000000006004040007010000500007600000090070030042053002601020970000",
+    "080031000000500130050080040490000270000007000300406000900100600600000400001900050",
+    "007000906009001708000020000000000800300092010004500060030000570506900000000410000",
+    "000700468004010000080000057809000010010053000000080600920640000601090200300000000",
+    "010008540000900270002015300600000403945003010000000000000839000809040006050000000",
+    "040000827000000009500018040007903000013020000090140000000005000050400001002060300",
+    "100700009000140300080006020000018400004007080000030006069003050005900000000200000",
+    "000348500004000000050000090008000201105000006300200800000460000000070102430500000",
+    "080100270067000500000007080000700804300024000420500000501000000000000000000010093",
+    "001008079000000304000527000020000907904000500500000002002000630000100000000406008",
+    "010360290000007000403000007005080006000000000068010030000005010000000653090200040",
+]
+
+# minimal puzzles: 17 givens, the fewest a unique 9x9 puzzle can have
+SEVENTEEN_CLUE = [
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "000000010400000000020000000000050604008000300001090000300400200050100000000807000",
+    "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+    "000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+    "000000012008030000000000040120500000000004700060000000507000300000620000000100000",
+    "000000012040050000000009000070600400000100000000000050000087500601000300200000000",
+    "000000012050400000000000030700600400001000000000080000920000800000510700000003000",
+    "000000012300000060000040000900000500000001070020000000000350400001400800060000000",
+]
+
+# known worst cases for search: deep trial and error, or built to defeat
+# naive row-major backtracking
+PATHOLOGICAL = [
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "000000000000003085001020000000507000004000100090000000500000073002010000000040009",
+    "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+]
+
+# N×N boards for the generalized engine (values above 9 are A-P)
+SIXTEEN = [
+    (
+        "0B0010DE000A360C"
+        "030000FB004D0028"
+        "000100AG00060F75"
+        "AG809C0370000004"
+        "10DEG0000069000F"
+        "0C003095B4F0800D"
+        "05600F74000000G0"
+        "74F00D1000A00930"
+        "B07481000620F350"
+        "3F95400080000G00"
+        "0020003F4070AE80"
+        "0000C20600000000"
+        "800000C9000510DB"
+        "573FD04000E09000"
+        "0006F000D1000800"
+        "400D000209GC0003"
+    ),
+    (
+        "0000009C0D100A04"
+        "0500000240AE3600"
+        "D072EA0408600000"
+        "B0003000C00F01D0"
+        "0083000F7020B00E"
+        "6C900207004B8000"
+        "04BE8GA3F6C00050"
+        "500004100AG00000"
+        "C75D002B84006F00"
+        "G000500DB2E0A040"
+        "000860G000050000"
+        "0E1B03080G06000D"
+        "000009060FD02B00"
+        "00C52070AE80G900"
+        "3900C0001002000A"
+        "0B00400A00000DF5"
+    ),
+    (
+        "A0030000007000GE"
+        "G0000090C4000D0F"
+        "C04050EG0D007009"
+        "20800300001E04C0"
+        "800009305000FA0B"
+        "0020000000E76C01"
+        "4B0006000200E080"
+        "00C0GE084A0B90D0"
+        "600C0G0E03A4209D"
+        "0800700000C5A3F4"
+        "000000069020G1E8"
+        "9D703A0001000000"
+        "B004000130000070"
+        "10000027BF40090A"
+        "70E090A3005G4FBC"
+        "309000C000805010"
+    ),
+    (
+        "5G0000E406DF0000"
+        "70F60B0000040000"
+        "00C000DF50G301AE"
+        "0E0A00G02000F000"
+        "4AD03500C00E0000"
+        "0980010D0760EC00"
+        "C000070005980410"
+        "000702BE00A08050"
+        "E2ACG00903506040"
+        "000F0C0000000805"
+        "D104835BEC2A90F0"
+        "8000D01600090000"
+        "032000000G050000"
+        "047DB000A0C00900"
+        "900G0E0100470080"
+        "0C1E00F0B83070D4"
+    ),
+]
+
+TWENTY_FIVE = [
+    (
+        "0HPG00C6IBNFE28300K00090O"
+        "0E80N50090B0400GPH701M300"
+        "K003AE8F0N0700P000DOC4000"
+        "D509OHP7000KM310046B8E0F0"
+        "64C0001K3A000900000NP0070"
+        "0F0NPD40O0806B0JM00000090"
+        "9K5ALFHG001000M00000E0B20"
+        "000016020000F0H05K9L0D00C"
+        "06E00K00AL0IDO4NHF0007030"
+        "I04007M0J0L9K0000600HF00P"
+        "0C0601A0K000L00000HG0P7M3"
+        "40ODIPJ0739010A0000000FHG"
+        "51A0000H0G30P0JD000IB0000"
+        "00N00LO40I0EC0070P03A0000"
+        "00J000BE60GH0FN0A059OLD40"
+        "A300520N0000GP000904000B0"
+        "O90L0070005001006I0E02000"
+        "0070MI000EH028F103A009LO0"
+        "B060030A004O0L08F00H7GP00"
+        "0000H9D004E0IC0P7GJ0K3000"
+        "0OI06J0000DLA5900000GNHP0"
+        "0B000090500C00IH0N070JM0K"
+        "L000DN0P000100300O060B00F"
+        "P0G00O0C00000E2M3J1K0A500"
+        "100MK0000000NH059A0D000C0"
+    ),
+    (
+        "0D4001P0N2AO800E0I0G0B0C0"
+        "NL010O78J0000F000M0D00H0I"
+        "00K0006GI0000090AJ00P02LN"
+        "J8AO7B0CF0H0GI000NPL934DM"
+        "000E0000M4010NP00F5C0O00J"
+        "00B000HI003GM60L00002D0N9"
+        "5IEC000M030DN028B700A0OJ0"
+        "P0O008K0000CI0H010004G3M0"
+        "000D20AJP00007K0000MH0E00"
+        "00300D2N90OLJ0ACE50008BF7"
+        "0E50IH00G0000DNA78F0J2P0L"
+        "G000M401D900O00K5C0EFA7B8"
+        "LO000000000KE0I000N000600"
+        "0070F00005603G02P0JO04900"
+        "D000N2J0007008006G03I05E0"
+        "2PLNO0070000000MD40000G6H"
+        "K5CF0I0000009000800700L00"
+        "H6G00M004D00000000E5BJ000"
+        "40DM1NO02L0J7000GH06EF050"
+        "A78J0FE000GI6030L2OP10D94"
+        "1200000000070006M30405I00"
+        "000087000F05H0G00102D6043"
+        "E0I0G6D000092000F0C08000O"
+        "00M0D90200JP0O80IE00C00K0"
+        "0K000000EI06430PJ000L0001"
+    ),
+]
+
+CORPORA = {
+    "easy": EASY,
+    "hard": HARD,
+    "17clue": SEVENTEEN_CLUE,
+    "pathological": PATHOLOGICAL,
+    "16x16": SIXTEEN,
+    "25x25": TWENTY_FIVE,
+}
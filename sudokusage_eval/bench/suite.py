@@ -0,0 +1,330 @@
+# sudokusage_eval/bench/suite.py
+"""
+Micro-benchmarks for the solver, generator, request validation and DB driver.
+
+Each benchmark cycles through a fixed input corpus and records the latency of
+every call, then makes a second, shorter pass under tracemalloc for the peak
+memory of one call (timing under tracemalloc would be distorted). Results are
+written to JSON; `compare` checks a run against a saved baseline.
+"""
+
+# imports
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# local imports
+from sudokusage_eval.bench.corpora import CORPORA
+
+RESULTS_VERSION = 1
+
+# default share a metric may worsen before it counts as a regression
+DEFAULT_THRESHOLD = 0.15
+
+# allocation peaks below this many bytes are noise, not regressions
+MIN_ALLOC_BYTES = 1024
+
+
+@dataclass
+class Bench:
+    name: str
+    fn: Callable[[Any], object]
+    inputs: Sequence[Any]
+    min_ops: int = 50           # at least this many timed calls...
+    max_ops: int = 100_000      # ...and at most this many, whatever --min-time says
+    alloc_ops: int = 20         # calls traced for allocations
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops: int
+    seconds: float
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    alloc_peak_bytes: int       # mean peak traced memory of one call
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    # nearest rank; the lists here are long enough that interpolation is moot
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_bench(bench: Bench, min_time: float = 1.0) -> BenchResult:
+    inputs = cycle(bench.inputs)
+
+    # warm caches, lazy imports and lru tables before timing
+    for _ in range(min(3, len(bench.inputs))):
+        bench.fn(next(inputs))
+
+    times: List[int] = []
+    clock = time.perf_counter_ns
+    start = clock()
+    deadline = start + int(min_time * 1e9)
+    while len(times) < bench.max_ops and (len(times) < bench.min_ops or clock() < deadline):
+        arg = next(inputs)
+        t0 = clock()
+        bench.fn(arg)
+        times.append(clock() - t0)
+    seconds = (clock() - start) / 1e9
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(min(bench.alloc_ops, len(times))):
+            arg = next(inputs)
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            bench.fn(arg)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    us = sorted(t / 1000 for t in times)
+    return BenchResult(
+        name=bench.name,
+        ops=len(times),
+        seconds=round(seconds, 4),
+        ops_per_sec=round(len(times) / seconds, 2),
+        mean_us=round(statistics.fmean(us), 2),
+        p50_us=round(_percentile(us, 0.50), 2),
+        p99_us=round(_percentile(us, 0.99), 2),
+        alloc_peak_bytes=round(statistics.fmean(peaks)) if peaks else 0,
+    )
+
+
+# ---------------------------------------------------------------------------
+# the suite
+# ---------------------------------------------------------------------------
+
+def _solver_benches() -> Iterator[Bench]:
+    from backend.services.board import solve_board
+
+    for name in ("easy", "hard", "17clue", "pathological"):
+        yield Bench(f"solve_board/{name}", solve_board, CORPORA[name])
+    yield Bench("solve_board/16x16", solve_board, CORPORA["16x16"], min_ops=20)
+    yield Bench("solve_board/25x25", solve_board, CORPORA["25x25"], min_ops=10, alloc_ops=4)
+
+
+def _generator_benches(seed: int) -> Iterator[Bench]:
+    from backend.services.board import generate_board
+
+    for difficulty in (0.1, 0.3, 0.5, 0.7):
+        # generate_board draws its seed from the global generator
+        random.seed(seed)
+        yield Bench(
+            f"generate_board/{difficulty}",
+            lambda d: generate_board(d),
+            [difficulty],
+            min_ops=20,
+            alloc_ops=5,
+        )
+    random.seed(seed)
+    yield Bench(
+        "generate_board/16x16",
+        lambda d: generate_board(d, size=16),
+        [0.5],
+        min_ops=5,
+        alloc_ops=2,
+    )
+
+
+def _request_benches(seed: int) -> Iterator[Bench]:
+    from sudoku import Sudoku
+    from backend.services.ai import validate_query_params
+    from backend.services.board import puzzle_to_str
+
+    boards = CORPORA["easy"] + CORPORA["hard"] + CORPORA["16x16"]
+    yield Bench(
+        "validate_query_params",
+        lambda b: validate_query_params(board=b, session_id="bench", messages=[]),
+        boards,
+        min_ops=1000,
+    )
+
+    puzzles = [Sudoku(3, seed=seed + i).difficulty(0.5) for i in range(8)]
+    yield Bench("puzzle_to_str", puzzle_to_str, puzzles, min_ops=1000)
+
+
+def _db_benches(db_dir: Path) -> Iterator[Bench]:
+    from backend.database import db_driver
+
+    # a scratch database; never the app's own
+    db_driver.DB_PATH = db_dir / "bench.db"
+    db_driver.init_db()
+
+    boards = CORPORA["easy"] + CORPORA["hard"]
+    yield Bench(
+        "db/create_puzzle",
+        lambda b: db_driver.create_puzzle(9, 3, 3, b),
+        boards,
+        min_ops=200,
+    )
+
+    puzzle = db_driver.create_puzzle(9, 3, 3, boards[0])
+    yield Bench(
+        "db/log_step",
+        lambda i: db_driver.log_step(puzzle, "bench", "Hint text.", i % 9 + 1, i // 9 % 9 + 1, i % 9 + 1, "Naked Single"),
+        range(81),
+        min_ops=200,
+    )
+    yield Bench("db/get_steps_for_puzzle", db_driver.get_steps_for_puzzle, [puzzle], min_ops=200)
+
+
+def build_suite(db_dir: Path, seed: int = 0) -> Iterator[Bench]:
+    # lazy, so each group's setup (seeding, the scratch DB) runs right before its benches
+    yield from _solver_benches()
+    yield from _generator_benches(seed)
+    yield from _request_benches(seed)
+    yield from _db_benches(db_dir)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, check=True,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(
+    only: Optional[List[str]] = None,
+    min_time: float = 1.0,
+    seed: int = 0,
+    progress: Callable[[BenchResult], None] = lambda r: None,
+) -> Dict[str, Any]:
+    """Run every benchmark whose name contains one of `only` (all if empty)."""
+    from backend.database import db_driver
+
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="sudoku-bench-", ignore_cleanup_errors=True) as tmp:
+        try:
+            for bench in build_suite(Path(tmp), seed):
+                if only and not any(pattern in bench.name for pattern in only):
+                    continue
+                result = run_bench(bench, min_time)
+                results.append(result)
+                progress(result)
+        finally:
+            db_driver.close_db()
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "min_time": min_time,
+            "seed": seed,
+        },
+        "results": [asdict(r) for r in results],
+    }
+
+
+def save_results(run: Dict[str, Any], path: str | Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: str | Path) -> Dict[str, Any]:
+    run = json.loads(Path(path).read_text(encoding="utf-8"))
+    if run.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} is not a version {RESULTS_VERSION} benchmark result.")
+    return run
+
+
+@dataclass
+class Change:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+@dataclass
+class Comparison:
+    changes: List[Change] = field(default_factory=list)
+    regressions: List[Change] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)    # in the baseline, not in this run
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    only: Optional[List[str]] = None,
+) -> Comparison:
+    """
+    Compare median latency and allocation peaks per benchmark. A metric that
+    grows by more than `threshold` (0.15 = 15%) is a regression. With `only`,
+    baseline entries the run skipped on purpose are left out.
+    """
+    now = {r["name"]: r for r in current["results"]}
+    out = Comparison()
+    for base in baseline["results"]:
+        if only and not any(pattern in base["name"] for pattern in only):
+            continue
+        cur = now.get(base["name"])
+        if cur is None:
+            out.missing.append(base["name"])
+            continue
+
+        for metric in ("p50_us", "alloc_peak_bytes"):
+            change = Change(base["name"], metric, base[metric], cur[metric])
+            out.changes.append(change)
+
+            if metric == "alloc_peak_bytes" and max(change.baseline, change.current) < MIN_ALLOC_BYTES:
+                continue
+            if change.ratio > 1 + threshold:
+                out.regressions.append(change)
+    return out
+
+
+def format_result(r: BenchResult) -> str:
+    return (
+        f"{r.name:<28} {r.ops:>7} ops  {r.ops_per_sec:>11,.1f}/s  "
+        f"p50 {r.p50_us:>10,.1f}us  p99 {r.p99_us:>10,.1f}us  "
+        f"peak {r.alloc_peak_bytes / 1024:>8,.1f}KiB"
+    )
+
+
+def format_comparison(cmp: Comparison, threshold: float) -> str:
+    lines = []
+    for c in cmp.changes:
+        flag = "REGRESSION" if c in cmp.regressions else ""
+        lines.append(
+            f"{c.name:<28} {c.metric:<17} {c.baseline:>12,.1f} -> {c.current:>12,.1f}  "
+            f"{(c.ratio - 1) * 100:>+7.1f}%  {flag}"
+        )
+    for name in cmp.missing:
+        lines.append(f"{name:<28} missing from this run")
+    lines.append(
+        f"{len(cmp.regressions)} regression(s) past {threshold:.0%}"
+        if cmp.regressions else f"No regressions past {threshold:.0%}"
+    )
+    return "\n".join(lines)
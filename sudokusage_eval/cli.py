@@ -1,5 +1,5 @@
 import argparse
-from sudokusage_eval.runners.sample import run_sample
+import os
 
 
 def main() -> int:
@@ -19,7 +19,7 @@ def main() -> int:
         "--out",
         type=str,
         default=None,
-        help="Optional CSV filepath to write per-sample results",
+        help="Optional CSV (or .jsonl) filepath; results are appended as each sample finishes",
     )
 
     sample_p.add_argument(
@@ -36,8 +36,281 @@ def main() -> int:
         help="Do not include the solved board in the prompt",
     )
 
+    sample_p.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        default=True,
+        help="Always call the model, even for prompts in the LLM response cache",
+    )
+
+    sample_p.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of samples in flight at once (default: 1)",
+    )
+    sample_p.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Max LLM requests per second (default: unlimited)",
+    )
+    sample_p.add_argument(
+        "--tpm",
+        type=int,
+        default=None,
+        help="Max estimated LLM tokens per minute (default: unlimited)",
+    )
+    sample_p.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries with exponential backoff on 429s, 5xx and connection errors (default: 5)",
+    )
+
+    sample_p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip samples already recorded in --out for the last (or --batch-id) batch",
+    )
+    sample_p.add_argument(
+        "--batch-id",
+        type=float,
+        default=None,
+        help="Batch id to write under (or resume with --resume)",
+    )
+    sample_p.add_argument(
+        "--boards",
+        type=str,
+        default=None,
+        help="Board manifest: replayed if it exists, newly generated boards are appended",
+    )
+
+    sample_p.add_argument(
+        "--bank",
+        type=str,
+        default=None,
+        help="Draw boards from a puzzle bank file instead of generating them",
+    )
+    sample_p.add_argument(
+        "--mock",
+        action="store_true",
+        help="Run offline against the bundled mock LLM (configured by MOCK_LLM_* env vars)",
+    )
+
+    mock_p = sub.add_parser("mock-llm", help="Serve a mock OpenAI-compatible API")
+    mock_p.add_argument("--host", default="127.0.0.1")
+    mock_p.add_argument("--port", type=int, default=8001)
+    mock_p.add_argument("--accuracy", type=float, default=None, help="Share of correct hints (default: 1.0)")
+    mock_p.add_argument("--latency-ms", type=float, default=None, help="Median time to first token (default: 300)")
+    mock_p.add_argument("--latency-sigma", type=float, default=None, help="Lognormal latency spread (default: 0)")
+    mock_p.add_argument("--token-delay-ms", type=float, default=None, help="Delay between streamed chunks (default: 5)")
+    mock_p.add_argument("--error-rate", type=float, default=None, help="Share of requests answered with 429 (default: 0)")
+    mock_p.add_argument("--seed", type=int, default=None)
+    mock_p.add_argument(
+        "--sampled",
+        dest="deterministic",
+        action="store_false",
+        default=None,
+        help="Draw replies from a seeded stream instead of hashing the prompt",
+    )
+
+    bank_p = sub.add_parser("build-bank", help="Build a memory-mapped puzzle bank")
+    bank_p.add_argument("--out", required=True, help="Bank file to write")
+    bank_p.add_argument("--count", type=int, default=10000, help="Puzzles to generate (default: 10000)")
+    bank_p.add_argument(
+        "--difficulties",
+        default="0.1,0.25,0.5,0.75",
+        help="Comma-separated difficulties to spread puzzles over",
+    )
+    bank_p.add_argument(
+        "--from-file",
+        dest="from_file",
+        default=None,
+        help="Rate and pack existing boards (one per line) instead of generating",
+    )
+    bank_p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    bank_p.add_argument("--seed", type=int, default=0)
+
+    import_p = sub.add_parser("import", help="Bulk-load puzzles into the database")
+    import_p.add_argument("path", help="Text file: 81-char boards per line or 9-line grids ('-' for stdin)")
+    import_p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    import_p.add_argument("--batch-size", type=int, default=20000, help="Rows per insert transaction")
+    import_p.add_argument("--dedupe", action="store_true", help="Skip puzzles symmetric to one already stored")
+    import_p.add_argument(
+        "--canonical",
+        action="store_true",
+        help="Store canonical hashes even without --dedupe (slower; implied by --dedupe)",
+    )
+    import_p.add_argument("--db", default=None, help="SQLite file (default: the app database)")
+
+    backfill_p = sub.add_parser("backfill-hashes", help="Fill in canonical hashes for stored 9x9 puzzles")
+    backfill_p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    backfill_p.add_argument("--db", default=None, help="SQLite file (default: the app database)")
+
+    export_p = sub.add_parser("export", help="Export stored puzzles with their solutions")
+    export_p.add_argument("out", help="Output file ('-' for stdout)")
+    export_p.add_argument("--format", choices=["csv", "jsonl", "txt"], default="csv")
+    export_p.add_argument("--limit", type=int, default=None)
+    export_p.add_argument("--db", default=None, help="SQLite file (default: the app database)")
+
+    bench_p = sub.add_parser("bench", help="Benchmark the solver, generator, validation and DB driver")
+    bench_p.add_argument("--out", default=None, help="Write results to this JSON file")
+    bench_p.add_argument("--baseline", default=None, help="Compare against an earlier results file")
+    bench_p.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Fail when a median latency or allocation peak grows by more than this share (default: 0.15)",
+    )
+    bench_p.add_argument(
+        "--only",
+        default=None,
+        help="Comma-separated name substrings, e.g. 'solve_board,db/' (default: all)",
+    )
+    bench_p.add_argument("--min-time", type=float, default=1.0, help="Seconds to time each benchmark (default: 1.0)")
+    bench_p.add_argument("--seed", type=int, default=0)
+
+    load_p = sub.add_parser("load", help="Load-test the app over HTTP")
+    load_p.add_argument(
+        "--url",
+        default=None,
+        help="Base URL of a running app (default: serve one in-process against the mock LLM)",
+    )
+    load_p.add_argument(
+        "--mix",
+        default=None,
+        help="Request weights from board, query, stream, steps (default: board=1,query=2,steps=1)",
+    )
+    load_p.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once (default: 16)")
+    load_p.add_argument("--duration", type=float, default=30.0, help="Seconds to run (default: 30)")
+    load_p.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead")
+    load_p.add_argument("--rps", type=float, default=None, help="Cap the request rate (default: closed loop)")
+    load_p.add_argument("--difficulty", type=float, default=0.5, help="Difficulty for /board/new (default: 0.5)")
+    load_p.add_argument("--boards", type=int, default=8, help="Boards created up front for queries (default: 8)")
+    load_p.add_argument("--timeout", type=float, default=60.0)
+    load_p.add_argument("--llm-latency-ms", type=float, default=None, help="Mock LLM latency (in-process only)")
+    load_p.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache on (in-process only)")
+    load_p.add_argument("--db", default=None, help="SQLite file for the in-process app (default: a scratch file)")
+    load_p.add_argument("--out", default=None, help="Write the report to this JSON file")
+    load_p.add_argument("--seed", type=int, default=0)
+
     args = parser.parse_args()
 
+    if args.command == "load":
+        from sudokusage_eval.runners.load import LoadConfig, format_report, parse_mix, run_load
+
+        try:
+            mix = parse_mix(args.mix)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+
+        if args.llm_latency_ms is not None:
+            os.environ["MOCK_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+
+        cfg = LoadConfig(
+            mix=mix,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            requests=args.requests,
+            rps=args.rps,
+            difficulty=args.difficulty,
+            boards=args.boards,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+        report = run_load(cfg, url=args.url, db=args.db, llm_cache=args.llm_cache, out=args.out)
+        print(format_report(report))
+        return 0
+
+    if args.command == "bench":
+        from sudokusage_eval.bench.suite import (
+            compare, format_comparison, format_result, load_results, run_suite, save_results,
+        )
+
+        # load first so a bad path fails before the run, not after
+        baseline = load_results(args.baseline) if args.baseline else None
+        only = [p.strip() for p in args.only.split(",") if p.strip()] if args.only else None
+
+        run = run_suite(
+            only=only,
+            min_time=args.min_time,
+            seed=args.seed,
+            progress=lambda r: print(format_result(r), flush=True),
+        )
+        if args.out:
+            save_results(run, args.out)
+            print(f"Wrote {len(run['results'])} results to {args.out}")
+
+        if baseline is not None:
+            cmp = compare(run, baseline, args.threshold, only)
+            print(format_comparison(cmp, args.threshold))
+            return 1 if cmp.regressions else 0
+        return 0
+
+    if args.command in ("import", "export", "backfill-hashes"):
+        import sys
+        from pathlib import Path
+        from backend.database import db_driver
+        from backend.services.bulk import backfill_canonical_hashes, export_puzzles, import_puzzles
+
+        if args.db:
+            db_driver.DB_PATH = Path(args.db)
+
+        if args.command == "backfill-hashes":
+            n = backfill_canonical_hashes(workers=args.workers)
+            print(f"Backfilled {n} canonical hashes")
+        elif args.command == "import":
+            src = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+            with src:
+                stats = import_puzzles(
+                    src,
+                    workers=args.workers,
+                    batch_size=args.batch_size,
+                    dedupe=args.dedupe,
+                    canonical=args.canonical,
+                )
+            print(
+                f"Read {stats.read}, inserted {stats.inserted} in {stats.seconds:.1f}s "
+                f"({stats.rate:.0f} boards/s); malformed {stats.malformed}, "
+                f"unsolvable {stats.unsolvable}, multiple solutions {stats.multiple}, "
+                f"duplicates {stats.duplicates}"
+            )
+        else:
+            db_driver.init_db()
+            dst = sys.stdout if args.out == "-" else open(args.out, "w", newline="", encoding="utf-8")
+            with dst:
+                n = export_puzzles(dst, fmt=args.format, limit=args.limit)
+            print(f"Exported {n} puzzles", file=sys.stderr)
+        return 0
+
+    if args.command == "build-bank":
+        from backend.services.bank import build_bank_from_boards, generate_bank
+
+        if args.from_file:
+            with open(args.from_file, encoding="utf-8") as f:
+                n = build_bank_from_boards(args.out, f, workers=args.workers)
+        else:
+            diffs = [float(d) for d in args.difficulties.split(",") if d.strip()]
+            n = generate_bank(args.out, args.count, diffs, workers=args.workers, seed=args.seed)
+
+        print(f"Wrote {n} puzzles to {args.out}")
+        return 0
+
+    if args.command == "mock-llm":
+        from dataclasses import replace
+        from sudokusage_eval.mock_llm import MockConfig, serve
+
+        overrides = {
+            k: getattr(args, k)
+            for k in ("accuracy", "latency_ms", "latency_sigma", "token_delay_ms", "error_rate", "seed", "deterministic")
+            if getattr(args, k) is not None
+        }
+        serve(host=args.host, port=args.port, cfg=replace(MockConfig.from_env(), **overrides))
+        return 0
+
     if args.command == "sample":
         try:
             diff = float(args.difficulty)
@@ -49,12 +322,34 @@ def main() -> int:
             print("Error: --difficulty must be between 0.0 and 1.0")
             return 1
 
+        if args.resume and not args.out:
+            print("Error: --resume requires --out")
+            return 1
+
+        # the runner builds its LLM clients lazily, so they pick up the mock URL
+        if args.mock:
+            from sudokusage_eval.mock_llm import start_in_background
+
+            os.environ["OPENAI_BASE_URL"] = start_in_background()
+            os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+        from sudokusage_eval.runners.sample import run_sample
+
         run_sample(
             model_name=args.model,
             difficulty=diff,
             samples=args.samples,
             include_solved=args.include_solved,
             out=args.out,
+            cache=args.cache,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            tpm=args.tpm,
+            max_retries=args.max_retries,
+            resume=args.resume,
+            batch_id=args.batch_id,
+            boards=args.boards,
+            bank=args.bank,
         )
 
     return 0
@@ -0,0 +1,341 @@
+# sudokusage_eval/mock_llm.py
+"""Local stand-in for the OpenAI Responses and Chat Completions endpoints.
+
+Point the app or the eval runner at it with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=mock
+
+Replies name a real next move for the board in the prompt (or a wrong one,
+at 1 - accuracy), so the whole hint pipeline runs without spending tokens.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.services.hints import MOVE_PATTERNS, find_logical_hint
+from backend.services.solver import solve
+from backend.utils import get_logger
+
+logger = get_logger(__name__)
+
+BOARD_PATTERN = re.compile(r"(?<![0-9.])[0-9.]{81}(?![0-9.])")
+
+
+@dataclass
+class MockConfig:
+    accuracy: float = 1.0        # share of replies that name a correct move
+    latency_ms: float = 300.0    # median time to first token
+    latency_sigma: float = 0.0   # lognormal spread of latency (0 = fixed)
+    token_delay_ms: float = 5.0  # gap between streamed chunks
+    error_rate: float = 0.0      # share of requests answered with HTTP 429
+    deterministic: bool = True   # same prompt -> same reply and latency
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "MockConfig":
+        return cls(
+            accuracy=float(os.getenv("MOCK_LLM_ACCURACY", "1.0")),
+            latency_ms=float(os.getenv("MOCK_LLM_LATENCY_MS", "300")),
+            latency_sigma=float(os.getenv("MOCK_LLM_LATENCY_SIGMA", "0")),
+            token_delay_ms=float(os.getenv("MOCK_LLM_TOKEN_DELAY_MS", "5")),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+            deterministic=os.getenv("MOCK_LLM_DETERMINISTIC", "true").lower() == "true",
+            seed=int(os.getenv("MOCK_LLM_SEED", "0")),
+        )
+
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return ""
+
+
+def _last_user_text(messages: list[dict[str, Any]]) -> str:
+    for m in reversed(messages):
+        if m.get("role", "user") == "user":
+            return _text_of(m.get("content"))
+    return ""
+
+
+def _latency(cfg: MockConfig, rng: random.Random) -> float:
+    seconds = cfg.latency_ms / 1000.0
+    if cfg.latency_sigma > 0:
+        seconds *= rng.lognormvariate(0.0, cfg.latency_sigma)
+    return seconds
+
+
+def _hint_reply(prompt: str, cfg: MockConfig, rng: random.Random) -> str:
+    match = BOARD_PATTERN.search(prompt)
+    if match is None:
+        return "Send me a Sudoku board and I will suggest the next move."
+
+    board = match.group(0).replace(".", "0")
+    solution, _ = solve(board)
+    if solution is None:
+        return "This board has no solution; check the digits already placed."
+
+    empties = [i for i, ch in enumerate(board) if ch == "0"]
+    if not empties:
+        return "The board is already solved."
+
+    if rng.random() < cfg.accuracy:
+        hint = find_logical_hint(board, solution)
+        if hint is not None:
+            r, c, value, method = hint.r, hint.c, hint.value, hint.method_used
+        else:
+            cell = rng.choice(empties)
+            r, c, value, method = cell // 9 + 1, cell % 9 + 1, int(solution[cell]), "Trial and Error"
+    else:
+        cell = rng.choice(empties)
+        wrong = [d for d in range(1, 10) if d != int(solution[cell])]
+        r, c, value, method = cell // 9 + 1, cell % 9 + 1, rng.choice(wrong), "Naked Single"
+
+    return (
+        f"**R{r}C{c} = {value}** ({method}). "
+        f"Look at row {r}, column {c} and the box they share: "
+        f"once the other candidates are ruled out, {value} is the digit that belongs here."
+    )
+
+
+def _extraction_args(prompt: str) -> dict[str, Any]:
+    for pattern in MOVE_PATTERNS:
+        m = pattern.search(prompt)
+        if m:
+            return {"r": int(m.group("r")), "c": int(m.group("c")), "value": int(m.group("v")), "method_used": "Unknown"}
+    return {"r": -1, "c": -1, "value": -1, "method_used": "Unknown"}
+
+
+def _chunks(text: str) -> list[str]:
+    # roughly one token per word, keeping the whitespace
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def _usage(prompt: str, reply: str) -> tuple[int, int]:
+    return max(1, len(prompt) // 4), max(1, len(reply) // 4)
+
+
+def _rate_limited() -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"error": {
+            "message": "Rate limit reached (mock).",
+            "type": "requests",
+            "param": None,
+            "code": "rate_limit_exceeded",
+        }},
+        headers={"retry-after-ms": "50"},
+    )
+
+
+def _sse(data: dict[str, Any], event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+def create_app(cfg: Optional[MockConfig] = None) -> FastAPI:
+    cfg = cfg or MockConfig.from_env()
+    app = FastAPI(title="SudokuSage mock LLM")
+    shared_rng = random.Random(cfg.seed)
+    stats = {"requests": 0, "rate_limited": 0}
+
+    def rng_for(body: dict[str, Any]) -> random.Random:
+        if not cfg.deterministic:
+            return shared_rng
+        payload = json.dumps(body.get("input") or body.get("messages"), sort_keys=True)
+        digest = hashlib.sha256(f"{cfg.seed}:{payload}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def should_fail() -> bool:
+        stats["requests"] += 1
+        # drawn from the shared stream so retries of one prompt can succeed
+        if cfg.error_rate > 0 and shared_rng.random() < cfg.error_rate:
+            stats["rate_limited"] += 1
+            return True
+        return False
+
+    @app.get("/v1/stats")
+    async def mock_stats() -> dict[str, Any]:
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if should_fail():
+            return _rate_limited()
+
+        rng = rng_for(body)
+        prompt = _last_user_text(body.get("messages", []))
+        model = body.get("model", "mock")
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        await asyncio.sleep(_latency(cfg, rng))
+
+        # structured extraction (with_structured_output, method="function_calling")
+        tools = body.get("tools") or []
+        if tools:
+            name = tools[0].get("function", {}).get("name", "extract")
+            message: dict[str, Any] = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(_extraction_args(prompt))},
+                }],
+            }
+            reply, finish = message["tool_calls"][0]["function"]["arguments"], "tool_calls"
+        else:
+            reply, finish = _hint_reply(prompt, cfg, rng), "stop"
+            message = {"role": "assistant", "content": reply}
+
+        prompt_tokens, completion_tokens = _usage(prompt, reply)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": usage,
+            }
+
+        async def events() -> AsyncIterator[str]:
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+            yield _sse({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+            for chunk in _chunks(reply):
+                await asyncio.sleep(cfg.token_delay_ms / 1000.0)
+                yield _sse({**base, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]})
+            yield _sse({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish}], "usage": usage})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        if should_fail():
+            return _rate_limited()
+
+        rng = rng_for(body)
+        raw_input = body.get("input", "")
+        if isinstance(raw_input, str):
+            prompt = raw_input
+        else:
+            prompt = _last_user_text([m for m in raw_input if isinstance(m, dict)])
+
+        model = body.get("model", "mock")
+        response_id = f"resp_{uuid.uuid4().hex}"
+        message_id = f"msg_{uuid.uuid4().hex}"
+        await asyncio.sleep(_latency(cfg, rng))
+
+        reply = _hint_reply(prompt, cfg, rng)
+        input_tokens, output_tokens = _usage(prompt, reply)
+
+        def response_obj(status: str, text: Optional[str]) -> dict[str, Any]:
+            output = []
+            if text is not None:
+                output.append({
+                    "type": "message",
+                    "id": message_id,
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                })
+            return {
+                "id": response_id,
+                "object": "response",
+                "created_at": int(time.time()),
+                "status": status,
+                "model": model,
+                "output": output,
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+                "error": None,
+                "incomplete_details": None,
+                "usage": {
+                    "input_tokens": input_tokens,
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens": output_tokens,
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens": input_tokens + output_tokens,
+                } if status == "completed" else None,
+            }
+
+        if not body.get("stream"):
+            return response_obj("completed", reply)
+
+        async def events() -> AsyncIterator[str]:
+            seq = 0
+
+            def event(kind: str, **data: Any) -> str:
+                nonlocal seq
+                seq += 1
+                return _sse({"type": kind, "sequence_number": seq - 1, **data}, event=kind)
+
+            where = {"item_id": message_id, "output_index": 0, "content_index": 0}
+            yield event("response.created", response=response_obj("in_progress", None))
+            yield event("response.output_item.added", output_index=0, item={
+                "type": "message", "id": message_id, "status": "in_progress", "role": "assistant", "content": [],
+            })
+            yield event("response.content_part.added", part={"type": "output_text", "text": "", "annotations": []}, **where)
+            for chunk in _chunks(reply):
+                await asyncio.sleep(cfg.token_delay_ms / 1000.0)
+                yield event("response.output_text.delta", delta=chunk, logprobs=[], **where)
+            yield event("response.output_text.done", text=reply, logprobs=[], **where)
+            yield event("response.content_part.done", part={"type": "output_text", "text": reply, "annotations": []}, **where)
+            done = response_obj("completed", reply)
+            yield event("response.output_item.done", output_index=0, item=done["output"][0])
+            yield event("response.completed", response=done)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def serve(host: str = "127.0.0.1", port: int = 8001, cfg: Optional[MockConfig] = None) -> None:
+    uvicorn.run(create_app(cfg), host=host, port=port, log_level="warning")
+
+
+def start_in_background(
+    host: str = "127.0.0.1", port: int = 0, cfg: Optional[MockConfig] = None
+) -> str:
+    """Run the mock in a daemon thread and return its base URL (``.../v1``)."""
+    server = uvicorn.Server(uvicorn.Config(create_app(cfg), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="mock-llm", daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("mock LLM server failed to start")
+        time.sleep(0.01)
+
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    url = f"http://{host}:{bound_port}/v1"
+    logger.info("Mock LLM listening on %s", url)
+    return url
@@ -0,0 +1,117 @@
+# sudokusage_eval/runners/checkpoint.py
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
+
+
+def _is_jsonl(path: Path) -> bool:
+    return path.suffix.lower() in (".jsonl", ".ndjson")
+
+
+class ResultWriter:
+    """Appends one result row at a time to a CSV or JSONL file and flushes it.
+
+    Every row is on disk as soon as `write` returns, so an interrupted run
+    loses at most the samples that were still in flight.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._jsonl = _is_jsonl(self.path)
+        self._needs_header = not (self.path.exists() and self.path.stat().st_size > 0)
+        self._file: TextIO = self.path.open("a", newline="", encoding="utf-8")
+        self._csv: Optional[csv.DictWriter] = None
+
+        # start on a fresh line if a previous run died mid-row
+        if not self._needs_header:
+            with self.path.open("rb") as f:
+                f.seek(-1, 2)
+                if f.read(1) != b"\n":
+                    self._file.write("\r\n" if not self._jsonl else "\n")
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self._jsonl:
+            self._file.write(json.dumps(row) + "\n")
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._file, fieldnames=list(row.keys()))
+                if self._needs_header:
+                    self._csv.writeheader()
+            self._csv.writerow(row)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def read_results(path: str | Path) -> Iterator[dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return
+
+    with path.open(newline="", encoding="utf-8") as f:
+        if _is_jsonl(path):
+            for line in f:
+                # a crash mid-write can leave a truncated last line
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        else:
+            yield from csv.DictReader(f)
+
+
+def last_batch_id(path: str | Path) -> Optional[float]:
+    batch_id = None
+    for row in read_results(path):
+        if row.get("batch_id") not in (None, ""):
+            batch_id = float(row["batch_id"])
+    return batch_id
+
+
+def completed_samples(path: str | Path, batch_id: float) -> set[int]:
+    done: set[int] = set()
+    for row in read_results(path):
+        try:
+            if float(row["batch_id"]) == batch_id:
+                done.add(int(row["sample_idx"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return done
+
+
+# board manifests: one 81-char board per line, line N is sample N
+def read_manifest(path: str | Path) -> Iterator[str]:
+    path = Path(path)
+    if not path.exists():
+        return
+
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            board = line.strip()
+            if len(board) == 81:
+                yield board
+
+
+class ManifestWriter:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: TextIO = self.path.open("a", encoding="utf-8")
+
+    def write(self, boards: list[str]) -> None:
+        self._file.writelines(b + "\n" for b in boards)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
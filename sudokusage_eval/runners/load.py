@@ -0,0 +1,400 @@
+# sudokusage_eval/runners/load.py
+"""
+HTTP load generator for the app.
+
+By default the app is served in this process by uvicorn on a background
+thread, with the mock LLM as its model and a scratch database, so a run costs
+no tokens and leaves the real database alone. A probe on the server's event
+loop measures its lag, and a watchdog thread records the stack of the loop
+thread whenever a tick is late, which shows where the loop stalls. With
+`url` set, an already running server is driven instead, and only client-side
+numbers are available.
+
+The in-process server shares the GIL with the load generator. For capacity
+numbers, run the app under uvicorn separately and pass its URL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.config.hints import SINGLE_HINT
+from backend.utils import get_logger
+from sudokusage_eval.runners.ratelimit import RateLimiter
+
+logger = get_logger(__name__)
+
+# latency histogram bucket upper bounds, in milliseconds (the last is open)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+DEFAULT_MIX = {"board": 1.0, "query": 2.0, "steps": 1.0}
+
+# repo code, as opposed to the stdlib or site-packages, when naming a stall site
+_ROOT = str(Path(__file__).resolve().parents[2])
+
+
+# ---------------------------------------------------------------------------
+# measurements
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)   # "HTTP 500", "ReadTimeout", ...
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms)
+
+    def histogram(self) -> List[int]:
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for ms in self.latencies_ms:
+            counts[bisect_left(BUCKETS_MS, ms)] += 1
+        return counts
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        errors = sum(self.errors.values())
+        return {
+            "requests": self.requests,
+            "rps": round(self.requests / seconds, 2) if seconds else 0.0,
+            "errors": dict(self.errors),
+            "error_rate": round(errors / self.requests, 4) if self.requests else 0.0,
+            "p50_ms": round(_percentile(lat, 0.50), 2),
+            "p90_ms": round(_percentile(lat, 0.90), 2),
+            "p99_ms": round(_percentile(lat, 0.99), 2),
+            "max_ms": round(lat[-1], 2) if lat else 0.0,
+            "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histogram())),
+        }
+
+
+class LoopMonitor:
+    """
+    Event-loop lag probe: a task that sleeps `interval` seconds and records
+    how late it wakes up. With `watch_thread` set, a watchdog thread samples
+    that thread's stack once per stall longer than `stall_ms`.
+    """
+
+    def __init__(self, interval: float = 0.01, stall_ms: float = 50.0) -> None:
+        self.interval = interval
+        self.stall_ms = stall_ms
+        self.lags_ms: List[float] = []
+        self.stall_sites: Counter = Counter()
+        self._beat = time.perf_counter()
+        self._stop = threading.Event()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (loop.time() - start - self.interval) * 1000))
+            self._beat = time.perf_counter()
+
+    def watch_thread(self, thread_id: int) -> None:
+        def watchdog() -> None:
+            sampled_beat = None
+            while not self._stop.wait(self.interval):
+                beat = self._beat
+                late_ms = (time.perf_counter() - beat) * 1000
+                if late_ms > self.stall_ms and beat != sampled_beat:
+                    sampled_beat = beat     # one sample per stall
+                    frame = sys._current_frames().get(thread_id)
+                    if frame is not None:
+                        self.stall_sites[_stall_site(frame)] += 1
+
+        threading.Thread(target=watchdog, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def summary(self) -> Dict[str, Any]:
+        lags = sorted(self.lags_ms)
+        return {
+            "samples": len(lags),
+            "p50_ms": round(_percentile(lags, 0.50), 2),
+            "p99_ms": round(_percentile(lags, 0.99), 2),
+            "max_ms": round(lags[-1], 2) if lags else 0.0,
+            "stalls": sum(1 for lag in lags if lag > self.stall_ms),
+            "stall_sites": dict(self.stall_sites.most_common(10)),
+        }
+
+
+# where a stalled loop thread is: its innermost frame, then the nearest repo
+# frames above it (the app code that led there)
+def _stall_site(frame) -> str:
+    def describe(f) -> str:
+        path = f.f_code.co_filename
+        if path.startswith(_ROOT):
+            path = str(Path(path).relative_to(_ROOT))
+        elif "site-packages" in path:
+            path = path.split("site-packages/", 1)[1]
+        else:
+            path = Path(path).name
+        return f"{path}:{f.f_lineno} {f.f_code.co_name}"
+
+    chain = [describe(frame)]
+    frame = frame.f_back
+    while frame is not None and len(chain) < 3:
+        path = frame.f_code.co_filename
+        if path.startswith(_ROOT) and "site-packages" not in path and path != __file__:
+            chain.append(describe(frame))
+        frame = frame.f_back
+    return " <- ".join(chain)
+
+
+# ---------------------------------------------------------------------------
+# in-process server
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LocalServer:
+    url: str
+    monitor: LoopMonitor
+    stop: Callable[[], None]
+
+
+def start_local_server(db_path: Path, llm_cache: bool = False, monitor: Optional[LoopMonitor] = None) -> LocalServer:
+    """Serve app:app on a free localhost port against the mock LLM and `db_path`."""
+    import uvicorn
+    from backend.database import db_driver
+    from sudokusage_eval.mock_llm import start_in_background
+
+    # clients are built in the app lifespan, so the mock URL has to be set first
+    os.environ["OPENAI_BASE_URL"] = start_in_background()
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    # the mock answers identical prompts identically, so caching would hide the LLM path
+    os.environ["LLM_CACHE"] = "true" if llm_cache else "false"
+    db_driver.DB_PATH = db_path
+
+    from app import app
+
+    monitor = monitor or LoopMonitor()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+
+    async def serve() -> None:
+        monitor.watch_thread(threading.get_ident())
+        probe = asyncio.create_task(monitor.run())
+        try:
+            await server.serve()
+        finally:
+            probe.cancel()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), name="app-server", daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("app server failed to start")
+        time.sleep(0.01)
+
+    def stop() -> None:
+        server.should_exit = True
+        thread.join(timeout=30)
+        monitor.stop()
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return LocalServer(url=f"http://127.0.0.1:{port}", monitor=monitor, stop=stop)
+
+
+# ---------------------------------------------------------------------------
+# load generation
+# ---------------------------------------------------------------------------
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    """'board=1,query=2,steps=1' -> weights; unknown names are rejected."""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("board", "query", "stream", "steps"):
+            raise ValueError(f"Unknown request type {name!r}; use board, query, stream or steps.")
+        mix[name] = float(weight) if weight else 1.0
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("The request mix needs at least one positive weight.")
+    return mix
+
+
+@dataclass
+class LoadConfig:
+    mix: Dict[str, float]
+    concurrency: int = 16
+    duration: float = 30.0
+    requests: Optional[int] = None      # stop after this many instead of `duration`
+    rps: Optional[float] = None         # open the throttle up to this rate (default: closed loop)
+    difficulty: float = 0.5
+    boards: int = 8                     # boards fetched up front for the query requests
+    timeout: float = 60.0
+    seed: int = 0
+
+
+async def _request(client: httpx.AsyncClient, kind: str, cfg: LoadConfig, boards: List[str], rng: random.Random, n: int):
+    if kind == "board":
+        return await client.post(f"/board/new/{cfg.difficulty}")
+    if kind == "steps":
+        return await client.get("/analytics/steps", params={"limit": 50})
+
+    board = rng.choice(boards)
+    body = {
+        "messages": [{"role": "user", "content": SINGLE_HINT}],
+        "board": board,
+        "puzzle_id": board,
+        "session_id": f"load-{n % cfg.concurrency}",
+        "fast_hint": False,     # always exercise the LLM path
+    }
+    if kind == "query":
+        return await client.post("/ai/query", json=body)
+
+    # stream: the latency that counts is to the last byte
+    async with client.stream("POST", "/ai/query/stream", json=body) as resp:
+        async for _ in resp.aiter_bytes():
+            pass
+        return resp
+
+
+async def run_load_async(url: str, cfg: LoadConfig) -> Dict[str, Any]:
+    rng = random.Random(cfg.seed)
+    kinds, weights = zip(*[(k, w) for k, w in cfg.mix.items() if w > 0])
+    stats: Dict[str, EndpointStats] = {k: EndpointStats() for k in kinds}
+    limiter = RateLimiter(rps=cfg.rps) if cfg.rps else None
+    client_monitor = LoopMonitor()
+
+    limits = httpx.Limits(max_connections=cfg.concurrency, max_keepalive_connections=cfg.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=cfg.timeout) as client:
+        # boards to ask about; created through the API so their puzzle rows exist
+        boards: List[str] = []
+        if "query" in kinds or "stream" in kinds:
+            for _ in range(cfg.boards):
+                resp = await client.post(f"/board/new/{cfg.difficulty}")
+                resp.raise_for_status()
+                boards.append(resp.json())
+
+        issued = 0
+        deadline = time.perf_counter() + cfg.duration
+
+        def more() -> bool:
+            if cfg.requests is not None:
+                return issued < cfg.requests
+            return time.perf_counter() < deadline
+
+        async def worker() -> None:
+            nonlocal issued
+            while more():
+                n, issued = issued, issued + 1
+                if limiter is not None:
+                    await limiter.acquire()
+                kind = rng.choices(kinds, weights)[0]
+                start = time.perf_counter()
+                try:
+                    resp = await _request(client, kind, cfg, boards, rng, n)
+                    if resp.status_code >= 400:
+                        stats[kind].errors[f"HTTP {resp.status_code}"] += 1
+                except httpx.HTTPError as e:
+                    stats[kind].errors[type(e).__name__] += 1
+                stats[kind].latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        probe = asyncio.create_task(client_monitor.run())
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(worker() for _ in range(cfg.concurrency)))
+        finally:
+            probe.cancel()
+        seconds = time.perf_counter() - start
+
+    total = sum(s.requests for s in stats.values())
+    return {
+        "url": url,
+        "config": asdict(cfg),
+        "seconds": round(seconds, 3),
+        "requests": total,
+        "rps": round(total / seconds, 2) if seconds else 0.0,
+        "endpoints": {k: s.summary(seconds) for k, s in stats.items()},
+        "client_loop_lag": client_monitor.summary(),
+    }
+
+
+def run_load(
+    cfg: LoadConfig,
+    url: Optional[str] = None,
+    db: Optional[str] = None,
+    llm_cache: bool = False,
+    out: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Drive `url`, or an in-process app when it is None; optionally save the report as JSON."""
+    server: Optional[LocalServer] = None
+    with tempfile.TemporaryDirectory(prefix="sudoku-load-", ignore_cleanup_errors=True) as tmp:
+        if url is None:
+            server = start_local_server(Path(db) if db else Path(tmp) / "load.db", llm_cache=llm_cache)
+            url = server.url
+            logger.info("In-process app listening on %s", url)
+        try:
+            report = asyncio.run(run_load_async(url, cfg))
+        finally:
+            if server is not None:
+                server.stop()
+
+    if server is not None:
+        report["server_loop_lag"] = server.monitor.summary()
+    if out:
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        Path(out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return report
+
+
+def _bar(count: int, peak: int, width: int = 40) -> str:
+    return "#" * max(1 if count else 0, round(width * count / peak)) if peak else ""
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['requests']} requests in {report['seconds']:.1f}s "
+        f"({report['rps']:.1f} req/s) against {report['url']}",
+    ]
+    for name, s in report["endpoints"].items():
+        lines.append("")
+        lines.append(
+            f"{name}: {s['requests']} req, {s['rps']:.1f} req/s, errors {s['error_rate']:.2%} {s['errors'] or ''}"
+        )
+        lines.append(
+            f"  p50 {s['p50_ms']:.1f}ms  p90 {s['p90_ms']:.1f}ms  p99 {s['p99_ms']:.1f}ms  max {s['max_ms']:.1f}ms"
+        )
+        peak = max(s["histogram"].values(), default=0)
+        for bucket, count in s["histogram"].items():
+            if count:
+                lines.append(f"  {bucket:>9} {count:>7} {_bar(count, peak)}")
+
+    for key, label in (("server_loop_lag", "server"), ("client_loop_lag", "client")):
+        lag = report.get(key)
+        if lag is None:
+            continue
+        lines.append("")
+        lines.append(
+            f"{label} event-loop lag: p50 {lag['p50_ms']:.1f}ms  p99 {lag['p99_ms']:.1f}ms  "
+            f"max {lag['max_ms']:.1f}ms  stalls {lag['stalls']}"
+        )
+        for site, count in lag["stall_sites"].items():
+            lines.append(f"  {count:>5}x {site}")
+    return "\n".join(lines)
@@ -0,0 +1,126 @@
+# sudokusage_eval/runners/ratelimit.py
+from __future__ import annotations
+
+import asyncio
+import random
+from time import monotonic
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+
+        # the lock keeps waiters first-come first-served
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-second and tokens-per-minute limits; either may be off."""
+
+    def __init__(self, rps: Optional[float] = None, tpm: Optional[float] = None) -> None:
+        self.requests = TokenBucket(rps) if rps else None
+        self.tokens = TokenBucket(tpm / 60.0, capacity=tpm) if tpm else None
+
+    async def acquire(self, tokens: int = 0) -> None:
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+
+def estimate_tokens(messages: list[dict[str, str]], completion_tokens: int = 1024) -> int:
+    # ~4 characters per token is close enough for budgeting
+    prompt_chars = sum(len(m.get("content", "")) for m in messages)
+    return prompt_chars // 4 + completion_tokens
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return _status_code(exc) == 429
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """429s, timeouts, 5xx and dropped connections; what the OpenAI SDK would retry."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    # openai.APIConnectionError / APITimeoutError and httpx transport errors carry no status
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    if type(exc).__module__.startswith("httpx"):
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+# seconds the server asked us to wait; OpenAI sends retry-after-ms alongside retry-after
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after-ms")) / 1000
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def with_backoff(
+    call: Callable[[], Awaitable[T]],
+    *,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+) -> T:
+    """
+    Retry `call` on transient errors with exponential backoff and full jitter,
+    waiting at least as long as a Retry-After header asks. Meant for clients
+    with their own retries off (open_llm_clients(max_retries=0)).
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as exc:
+            if not is_retryable_error(exc) or attempt >= max_retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            retry_after = _retry_after(exc)
+            if retry_after is not None:
+                delay = max(delay, min(max_delay, retry_after))
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -1,22 +1,38 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
+from itertools import islice
 from time import perf_counter
 from typing import Optional
 from pathlib import Path
-import csv
 import asyncio
 import time
 
 from backend.utils import get_logger
-from backend.services.board import solve_board, generate_board
-from backend.services.ai import call_llm, build_messages, add_board_to_dict_messages
+from backend.services.bank import PuzzleBank, load_bank
+from backend.services.board import solve_boards, generate_board
+from backend.services.canonical import canonical_hash
+from backend.services.ai import (
+    call_llm,
+    build_messages,
+    add_board_to_dict_messages,
+    open_llm_clients,
+    close_llm_clients,
+)
 from backend.config.hints import SINGLE_HINT
-from backend.services.hints import extract_hint_fields
+from backend.services.hints import aextract_hint_fields
+from backend.services.profiling import profiler
 from sudokusage_eval.metrics.validity import is_valid_solution
+from sudokusage_eval.runners.ratelimit import RateLimiter, estimate_tokens, with_backoff
+from sudokusage_eval.runners.checkpoint import (
+    ResultWriter,
+    ManifestWriter,
+    completed_samples,
+    last_batch_id,
+    read_manifest,
+)
 
 logger = get_logger(__name__)
-logger.setLevel("INFO")
 
 
 @dataclass
@@ -35,104 +51,235 @@ class SampleRow:
     solved_board: str
 
 
-def _write_csv(path: Path, rows: list[SampleRow]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    file_exists = path.exists() and path.stat().st_size > 0
+# boards are generated and batch-solved in chunks of this size
+BOARD_CHUNK = 64
 
-    with path.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=list(asdict(rows[0]).keys()),
+
+def _generate_unique(
+    count: int,
+    difficulty: float,
+    seen_boards: set[str],
+    bank: Optional[PuzzleBank] = None,
+) -> list[str]:
+    boards: list[str] = []
+    while len(boards) < count:
+        # draw from the bank first; symmetric variants count as already seen
+        pzl_str = bank.pick(difficulty) if bank is not None else None
+        key = canonical_hash(pzl_str) if pzl_str is not None else None
+        if key is None or key in seen_boards:
+            pzl_str = generate_board(difficulty=difficulty)
+            key = canonical_hash(pzl_str)
+        if key in seen_boards:
+            continue
+
+        seen_boards.add(key)
+        boards.append(pzl_str)
+    return boards
+
+
+async def _run_one(
+    *,
+    batch_id: float,
+    sample_idx: int,
+    pzl_str: str,
+    solved: str,
+    model_name: str,
+    difficulty: float,
+    include_solved: bool,
+    cache: bool,
+    limiter: RateLimiter,
+    max_retries: int,
+) -> SampleRow:
+    msgs = build_messages(SINGLE_HINT)
+    msgs = add_board_to_dict_messages(
+        msgs,
+        board=pzl_str,
+        solution=solved,
+        include_solved=include_solved,
+    )
+
+    latency = 0.0
+
+    async def attempt() -> str:
+        nonlocal latency
+        # wait for rate-limit budget first so latency excludes queueing
+        await limiter.acquire(estimate_tokens(msgs))
+
+        start = perf_counter()
+        response = await call_llm(
+            msgs, model=model_name, board=pzl_str, cache=None if cache else False
         )
+        latency = perf_counter() - start  # only the attempt that succeeded
+        return response
 
-        if not file_exists:
-            writer.writeheader()
+    # call llm
+    response = await with_backoff(attempt, max_retries=max_retries)
 
-        for r in rows:
-            writer.writerow(asdict(r))
+    # parse results
+    hint = await aextract_hint_fields(response, board=pzl_str, solution=solved)
+    hint_str_pos = (hint.r - 1) * 9 + (hint.c - 1)
+    predicted_board = (
+        pzl_str[:hint_str_pos] + str(hint.value) + pzl_str[hint_str_pos + 1 :]
+    )
 
+    return SampleRow(
+        batch_id=batch_id,
+        sample_idx=sample_idx,
+        model_name=model_name,
+        difficulty=difficulty,
+        include_solved=include_solved,
+        latency_sec=latency,
+        correct=is_valid_solution(predicted_board, solved),
+        hint_r=hint.r,
+        hint_c=hint.c,
+        hint_value=hint.value,
+        problem_board=pzl_str,
+        solved_board=solved,
+    )
 
 
-def run_sample(
+async def run_sample_async(
     *,
     model_name: str,
     difficulty: float,
     samples: int,
     include_solved: bool = False,
     out: Optional[str | Path] = None,
+    cache: bool = True,
+    concurrency: int = 1,
+    rps: Optional[float] = None,
+    tpm: Optional[int] = None,
+    max_retries: int = 5,
+    resume: bool = False,
+    batch_id: Optional[float] = None,
+    boards: Optional[str | Path] = None,
+    bank: Optional[str | Path] = None,
 ) -> None:
-    rows: list[SampleRow] = []
+    # resuming reuses the batch id so finished (batch_id, sample_idx) pairs are skipped
+    done: set[int] = set()
+    if resume:
+        if not out:
+            raise ValueError("resume requires an output file")
+        if batch_id is None:
+            batch_id = last_batch_id(out)
+        if batch_id is not None:
+            done = completed_samples(out, batch_id)
+            logger.info("Resuming batch %s: %d sample(s) already recorded", batch_id, len(done))
 
-    id = time.time()
+    id = batch_id if batch_id is not None else time.time()
+    limiter = RateLimiter(rps=rps, tpm=tpm)
+    concurrency = max(1, concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
 
+    puzzle_bank = load_bank(bank)
+    writer = ResultWriter(out) if out else None
+    manifest = ManifestWriter(boards) if boards else None
+
+    # running totals only, so memory does not grow with the sample count
+    recorded = 0
     total_latency = 0.0
     total_correct = 0
-    seen_boards = set()
+    failures = 0
 
-    for i in range(samples):
-        # create board
-        pzl_str = generate_board(difficulty=difficulty)
-        while pzl_str in seen_boards:
-            pzl_str = generate_board(difficulty=difficulty)
+    # stage 1: replay the board manifest, then generate (and record) the rest
+    async def produce() -> None:
+        seen_boards: set[str] = set()  # canonical hashes
+        idx = 0
 
-        seen_boards.add(pzl_str)
+        async def emit(chunk: list[tuple[int, str]]) -> None:
+            if not chunk:
+                return
+            solutions = await asyncio.to_thread(solve_boards, [b for _, b in chunk])
+            for (sample_idx, pzl_str), solved in zip(chunk, solutions):
+                await queue.put((sample_idx, pzl_str, solved))
 
-        pzl_str = generate_board(difficulty=difficulty)
-        solved = solve_board(pzl_str)
+        chunk: list[tuple[int, str]] = []
+        for pzl_str in islice(read_manifest(boards), samples) if boards else ():
+            idx += 1
+            seen_boards.add(canonical_hash(pzl_str))
+            if idx not in done:
+                chunk.append((idx, pzl_str))
+            if len(chunk) == BOARD_CHUNK:
+                await emit(chunk)
+                chunk = []
+        await emit(chunk)
 
-        msgs = build_messages(SINGLE_HINT)
-        msgs = add_board_to_dict_messages(
-            msgs,
-            board=pzl_str,
-            solution=solved,
-            include_solved=include_solved,
-        )
+        while idx < samples:
+            count = min(BOARD_CHUNK, samples - idx)
+            new_boards = await asyncio.to_thread(
+                _generate_unique, count, difficulty, seen_boards, puzzle_bank
+            )
+            if manifest is not None:
+                manifest.write(new_boards)
 
-        # call llm
-        start = perf_counter()
-        response = asyncio.run(call_llm(msgs, model=model_name))
-        latency = perf_counter() - start
-
-        # parse results
-        hint = extract_hint_fields(response)
-        hint_str_pos = (hint.r - 1) * 9 + (hint.c - 1)
-        predicted_board = (
-            pzl_str[:hint_str_pos] + str(hint.value) + pzl_str[hint_str_pos + 1 :]
-        )
+            chunk = []
+            for pzl_str in new_boards:
+                idx += 1
+                if idx not in done:
+                    chunk.append((idx, pzl_str))
+            await emit(chunk)
 
-        correct = is_valid_solution(predicted_board, solved)
-
-        total_latency += latency
-        total_correct += int(correct)
-
-        rows.append(
-            SampleRow(
-                batch_id=id,
-                sample_idx=i + 1,
-                model_name=model_name,
-                difficulty=difficulty,
-                include_solved=include_solved,
-                latency_sec=latency,
-                correct=correct,
-                hint_r=hint.r,
-                hint_c=hint.c,
-                hint_value=hint.value,
-                problem_board=pzl_str,
-                solved_board=solved,
-            )
-        )
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    # stage 2: LLM call and hint extraction, `concurrency` at a time
+    async def work() -> None:
+        nonlocal recorded, total_latency, total_correct, failures
+        while (item := await queue.get()) is not None:
+            sample_idx, pzl_str, solved = item
+            try:
+                with profiler.profile("eval_sample"):
+                    row = await _run_one(
+                        batch_id=id,
+                        sample_idx=sample_idx,
+                        pzl_str=pzl_str,
+                        solved=solved,
+                        model_name=model_name,
+                        difficulty=difficulty,
+                        include_solved=include_solved,
+                        cache=cache,
+                        limiter=limiter,
+                        max_retries=max_retries,
+                    )
+            except Exception:
+                failures += 1
+                logger.exception("Sample %d failed", sample_idx)
+                continue
 
-    # write csv
-    if out and rows:
-        _write_csv(Path(out), rows)
+            if writer is not None:
+                writer.write(asdict(row))
+            recorded += 1
+            total_latency += row.latency_sec
+            total_correct += int(row.correct)
+
+    # SDK retries off: with_backoff owns them, so latency_sec is one clean attempt
+    await open_llm_clients([model_name], max_retries=0)
+    try:
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    finally:
+        await close_llm_clients()
+        if writer is not None:
+            writer.close()
+        if manifest is not None:
+            manifest.close()
+        if puzzle_bank is not None:
+            puzzle_bank.close()
+        # PROFILE_SAMPLE_RATE > 0 profiles a share of samples
+        profiler.flush()
 
     # print averages
-    mean_latency = total_latency / samples if samples else 0.0
-    accuracy = total_correct / samples if samples else 0.0
+    mean_latency = total_latency / recorded if recorded else 0.0
+    accuracy = total_correct / recorded if recorded else 0.0
 
     logger.info(
-        f"Avg latency: {mean_latency:.6f}s | Accuracy: {accuracy:.3%} "
-        f"({total_correct}/{samples})"
+        "Avg latency: %.6fs | Accuracy: %.3f%% (%d/%d)",
+        mean_latency, accuracy * 100, total_correct, recorded,
     )
+    if failures:
+        logger.warning("%d sample(s) failed; rerun with --resume to retry them", failures)
     if out:
-        logger.info(f"Wrote CSV: {out}")
+        logger.info("Wrote results: %s (batch_id=%s)", out, id)
+
+
+def run_sample(**kwargs) -> None:
+    asyncio.run(run_sample_async(**kwargs))